@@ -1,129 +1,10 @@
-import ply.lex as lex
-import ply.yacc as yacc
+import sys
 
-# Lexer
-tokens = ['IF', 'WHILE', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 
-          'IDENTIFIER', 'ASSIGN', 'NUMBER', 'EQ', 'LT', 'GT', 
-          'LE', 'GE', 'NEQ', 'PLUS', 'MINUS', 'SEMICOLON']
+from miniparsers import get_grammar
+from miniparsers.diagnostics import PrintSink, set_sink
 
-# Define token patterns
-t_LPAREN = r'\('
-t_RPAREN = r'\)'
-t_LBRACE = r'\{'
-t_RBRACE = r'\}'
-t_ASSIGN = r'='  # Assignment operator
-t_PLUS = r'\+'
-t_MINUS = r'-'
-t_SEMICOLON = r';'
-
-# Comparison operators
-t_EQ = r'=='
-t_NEQ = r'!='
-t_LT = r'<'
-t_GT = r'>'
-t_LE = r'<='
-t_GE = r'>='
-
-# Reserved keywords
-reserved = {
-    'if': 'IF',
-    'while': 'WHILE'
-}
-
-# Identifier rule
-def t_IDENTIFIER(t):
-    r'[a-zA-Z_][a-zA-Z0-9_]*'
-    t.type = reserved.get(t.value, 'IDENTIFIER')  # Check for reserved keywords
-    return t
-
-# Number rule
-def t_NUMBER(t):
-    r'\d+'
-    t.value = int(t.value)  # Convert to an integer
-    return t
-
-# Ignore single-line comments (e.g., // comment)
-def t_COMMENT(t):
-    r'//.*'
-    pass  # Ignore comments
-
-# Track newlines
-def t_newline(t):
-    r'\n+'
-    t.lexer.lineno += len(t.value)
-
-# Ignore spaces and tabs
-t_ignore = ' \t'
-
-# Error handling
-def t_error(t):
-    print(f"Illegal character '{t.value[0]}' at line {t.lineno}")
-    t.lexer.skip(1)
-
-# Build the lexer
-lexer = lex.lex()
-
-# Parser
-
-# Define precedence of operators
-precedence = (
-    ('left', 'PLUS', 'MINUS'),  # Addition and subtraction
-    ('nonassoc', 'LT', 'GT', 'LE', 'GE', 'EQ', 'NEQ'),  # Comparison operators
-)
-
-# Define grammar rules
-def p_program(p):
-    '''program : statement_list'''
-    pass
-
-def p_statement_list(p):
-    '''statement_list : statement_list statement
-                      | statement
-                      | '''  # This allows an empty block (no statements)
-    pass
-
-def p_if(p):
-    '''statement : IF LPAREN condition RPAREN block'''
-    print("Valid if statement")  # Output for valid if statement
-
-def p_while(p):
-    '''statement : WHILE LPAREN condition RPAREN block'''
-    print("Valid while statement")  # Output for valid while statement
-
-def p_condition(p):
-    '''condition : expression EQ expression
-                 | expression NEQ expression
-                 | expression LT expression
-                 | expression GT expression
-                 | expression LE expression
-                 | expression GE expression'''
-    pass
-
-def p_expression(p):
-    '''expression : IDENTIFIER
-                  | NUMBER
-                  | expression PLUS expression
-                  | expression MINUS expression'''
-    pass
-
-# Assignment rule for the block
-def p_assignment(p):
-    '''statement : IDENTIFIER ASSIGN expression SEMICOLON'''
-    pass
-
-def p_block(p):
-    '''block : LBRACE statement_list RBRACE'''
-    pass
-
-# Handle syntax errors
-def p_error(p):
-    if p:
-        print(f"Syntax error at '{p.value}'")
-    else:
-        print("Syntax error at EOF")
-
-# Build the parser
-parser = yacc.yacc()
+# if/while dialect; the lexer and parser are built on the first parse
+grammar = get_grammar('while')
 
 # Test input for a C++ style if and while statements
 test_code = """
@@ -136,6 +17,20 @@ while (y < 5) {
 }
 """
 
-# Run the lexer and parser on the test input
-result = parser.parse(test_code)
-print(result)
\ No newline at end of file
+
+def parse(code):
+    return grammar.parse(code)
+
+
+def main():
+    set_sink(PrintSink())  # report lexical and syntax errors on the console
+    # Run the lexer and parser on the test input
+    result = parse(test_code)
+    print(result)
+    if '--run' in sys.argv[1:]:
+        # Execute the program on the bytecode VM and show its variables
+        print(grammar.run(test_code, max_steps=10**6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Ahead-of-time tables (python -m miniparsers.aot) vs building them at start.
+#
+# The compiled tables of every dialect must equal the ones yacc.yacc()
+# builds, and the compiled lexer must give the tokens of lex.lex().  Then
+# generated programs are parsed and lexed in a python -OO interpreter, which
+# strips the docstrings PLY reads the grammar from; trees, diagnostics and
+# tokens must be the ones of a plain interpreter.  Without compiled tables,
+# -OO must fail with the message that says how to build them.
+#
+# The timings are of a fresh interpreter getting from imported modules to a
+# ready lexer and parser: lex.lex() and yacc.yacc() building them from the
+# rules, lex.lex() with build_parser() loading the pickled tables of a warm
+# cache, and the compiled modules.
+#
+#   python benchmarks/aot.py [--runs N] [--programs N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import aot, get_grammar, grammar_names  # noqa: E402
+from miniparsers.lexer import ply_lexer  # noqa: E402
+from generators import program  # noqa: E402
+
+# Prints the trees, diagnostics and tokens of the programs on stdin, one per
+# line, so the output of two interpreters can be compared
+PARSE = '''
+import json, sys
+from miniparsers import get_grammar
+from miniparsers.lexer import ply_lexer
+for line in sys.stdin:
+    name, text = json.loads(line)
+    grammar = get_grammar(name)
+    tree, found = grammar.check(text)
+    lexer = ply_lexer()
+    lexer.input(text)
+    tokens = [(t.type, t.value, t.lineno, t.lexpos) for t in iter(lexer.token, None)]
+    fast = [(t.type, t.value, t.lineno, t.lexpos) for t in grammar.tokenize(text)]
+    print(repr((name, grammar.signature, tree, found, tokens == fast, tokens)))
+'''
+
+START = '''
+import sys, time
+import ply.lex as lex, ply.yacc as yacc
+from miniparsers import lexer, tables
+from miniparsers.registry import get_grammar
+module = get_grammar({name!r}).module
+start = time.perf_counter()
+if {mode!r} == 'yacc':
+    lex.lex(module=lexer)
+    yacc.yacc(module=module, debug=False, write_tables=False)
+elif {mode!r} == 'pickle':
+    lex.lex(module=lexer)
+    tables.build_parser(module, {name!r}, compiled=False)
+else:
+    lexer.ply_lexer()
+    tables.build_parser(module, {name!r})
+print(time.perf_counter() - start)
+'''
+
+MISSING = '''
+from miniparsers import get_grammar, tables
+tables.COMPILED = 'miniparsers.nonexistent'
+try:
+    get_grammar('while').parse('x = 1;')
+except RuntimeError as e:
+    print(e)
+'''
+
+
+def python(code, *options, stdin='', env=None):
+    proc = subprocess.run([sys.executable, *options, '-c', code], input=stdin, cwd=ROOT,
+                          env=dict(os.environ, **(env or {})), text=True, capture_output=True)
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    return proc.stdout
+
+
+def check_tables():
+    import ply.lex as lex
+    import ply.yacc as yacc
+    from miniparsers import lexer, tables
+    for name in grammar_names():
+        module = get_grammar(name).module
+        built = yacc.yacc(module=module, debug=False, write_tables=False)
+        loaded = tables.load_compiled(module, name)
+        if loaded is None:
+            sys.exit(f'{name}: no current compiled tables')
+        if (loaded.action, loaded.goto) != (built.action, built.goto) or \
+                [(p.str, p.len, p.callable) for p in loaded.productions] != \
+                [(p.str, p.len, p.callable) for p in built.productions]:
+            sys.exit(f'{name}: the compiled tables differ from yacc.yacc()')
+    text = ''.join(program('function', 200)[0] for _ in range(2)) + ' @ 1.5 \n'
+    streams = []
+    for lexer_ in (lex.lex(module=lexer), ply_lexer()):
+        lexer_.reserved = lexer.reserved
+        lexer_.input(text)
+        streams.append([(t.type, t.value, t.lineno, t.lexpos) for t in iter(lexer_.token, None)])
+    if streams[0] != streams[1]:
+        sys.exit('the compiled lexer differs from lex.lex()')
+
+
+def check_optimized(programs):
+    import json
+    lines = []
+    for name in grammar_names():
+        for seed in range(programs):
+            text, _ = program(name, 20, seed=seed)
+            if seed % 3 == 1:
+                text = text.replace(';', ' ) ;', 1)
+            lines.append(json.dumps([name, text]) + '\n')
+    stdin = ''.join(lines)
+    plain = python(PARSE, stdin=stdin)
+    if python(PARSE, '-OO', stdin=stdin) != plain:
+        sys.exit('python -OO parses differently')
+    message = python(MISSING, '-OO').strip()
+    if 'miniparsers.aot' not in message:
+        sys.exit(f'python -OO without compiled tables: {message or "no error"}')
+    return len(lines)
+
+
+def start(name, mode, cache_dir):
+    code = START.format(name=name, mode=mode)
+    return float(python(code, env={'AFLL_TABLE_DIR': cache_dir}).split()[-1])
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = int(argv[argv.index('--runs') + 1]) if '--runs' in argv else 5
+    programs = int(argv[argv.index('--programs') + 1]) if '--programs' in argv else 30
+
+    for path in aot.build(grammar_names()):
+        print(f'wrote {os.path.relpath(path, ROOT)}')
+    check_tables()
+    print('compiled tables equal the ones lex.lex() and yacc.yacc() build')
+    count = check_optimized(programs)
+    print(f'{count} programs parsed and lexed identically under python -OO')
+
+    print()
+    print(f"{'grammar':<10} {'lex+yacc ms':>12} {'pickle ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in grammar_names():
+            start(name, 'pickle', cache_dir)  # populate the table cache
+            times = [statistics.median(start(name, mode, cache_dir) for _ in range(runs)) * 1000
+                     for mode in ('yacc', 'pickle', 'compiled')]
+            print(f'{name:<10} {times[0]:12.2f} {times[1]:10.2f} {times[2]:12.2f} {times[0] / times[2]:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
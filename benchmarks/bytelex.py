@@ -0,0 +1,118 @@
+import os
+import sys
+import tempfile
+import time
+
+# Lexing a file from an mmap'ed buffer vs read() + decode + the shared lexer.
+#
+# Both lexers must produce the same (type, value, lineno, lexpos) stream for the
+# generated ASCII program; the timings cover opening the file through the last
+# token, with and without reading every token value.  Then the file is
+# validated the way miniparsers.batch did (the mapped bytes) and does (the
+# mapped file decoded in one call, then the shared lexer).
+#
+#   python benchmarks/bytelex.py [--mb N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.batch import decoded  # noqa: E402
+from miniparsers.bytelex import ByteLexer, mapped  # noqa: E402
+from stream_memory import generate  # noqa: E402
+
+
+def lex_text(grammar, path, values):
+    with open(path, 'rb') as f:
+        text = f.read().decode('utf-8')
+    lexer = grammar.lexer()
+    lexer.input(text)
+    count = 0
+    for tok in iter(lexer.token, None):
+        if values:
+            tok.value
+        count += 1
+    return count
+
+
+def lex_mmap(grammar, path, values):
+    with mapped(path) as data:
+        lexer = ByteLexer(grammar.reserved)
+        lexer.input(data)
+        count = 0
+        for tok in lexer:
+            if values:
+                tok.value
+            count += 1
+    return count
+
+
+def lex_decoded(grammar, path, values):
+    with mapped(path) as data:
+        lexer = grammar.lexer()
+        lexer.input(str(data, 'utf-8'))
+        count = 0
+        for tok in iter(lexer.token, None):
+            if values:
+                tok.value
+            count += 1
+    return count
+
+
+def validate_mmap(grammar, path, decode):
+    with mapped(path) as data:
+        if not grammar.validate(decoded(data) if decode else data):
+            sys.exit('the generated program is not valid')
+    return None
+
+
+def check(grammar, path):
+    with open(path) as f:
+        lexer = grammar.lexer()
+        lexer.input(f.read())
+        expected = [(t.type, t.value, t.lineno, t.lexpos) for t in iter(lexer.token, None)]
+    with mapped(path) as data:
+        lexer = ByteLexer(grammar.reserved)
+        lexer.input(data)
+        got = [(t.type, t.value, t.lineno, t.lexpos) for t in lexer]
+    if got != expected:
+        sys.exit('ByteLexer and lexer disagree')
+
+
+def best(func, *args, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        count = func(*args)
+        times.append(time.perf_counter() - start)
+    return count, min(times)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    mb = float(argv[argv.index('--mb') + 1]) if '--mb' in argv else 4
+    grammar = get_grammar('while')
+
+    with tempfile.NamedTemporaryFile('w', suffix='.c', delete=False) as f:
+        for block in generate(int(mb * 1024 * 1024)):
+            f.write(block)
+    try:
+        check(grammar, f.name)
+        print(f"{'lexer':<22} {'tokens':>9} {'seconds':>9} {'Mtok/s':>8}   ({mb:g} MB input)")
+        for label, func, values in (('read+decode+lex', lex_text, False),
+                                    ('mmap+decode+lex', lex_decoded, False),
+                                    ('mmap ByteLexer', lex_mmap, False),
+                                    ('mmap ByteLexer+values', lex_mmap, True)):
+            count, seconds = best(func, grammar, f.name, values)
+            print(f'{label:<22} {count:9d} {seconds:9.3f} {count / seconds / 1e6:8.2f}')
+        print()
+        print(f"{'validate':<22} {'':>9} {'seconds':>9} {'Mtok/s':>8}")
+        for label, decode in (('mmap bytes', False), ('mmap+decode (batch)', True)):
+            _, seconds = best(validate_mmap, grammar, f.name, decode)
+            print(f'{label:<22} {"":>9} {seconds:9.3f} {count / seconds / 1e6:8.2f}')
+    finally:
+        os.remove(f.name)
+
+
+if __name__ == '__main__':
+    main()
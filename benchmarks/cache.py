@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import time
+
+# Repeat validation with and without a ParseCache.
+#
+# The same set of generated snippets is validated several times: without a
+# cache, through a warm in-memory cache, and through a fresh cache that only
+# has the on-disk tier of an earlier run.  Hashing the inputs alone is timed
+# as the floor a cache hit can reach.  A small cache shows the LRU evicting.
+# Broken snippets must report the same diagnostics to the sink from parse()
+# on a miss, a memory hit and a disk hit as without a cache.
+#
+#   python benchmarks/cache.py [--snippets N] [--statements N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.cache import ParseCache, digest  # noqa: E402
+from miniparsers.diagnostics import ListSink, using  # noqa: E402
+from generators import snippets  # noqa: E402
+
+
+def per_item(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def reported(grammar, sources):
+    # (tree, diagnostics handed to the sink) of parse() for every source
+    out = []
+    for source in sources:
+        with using(ListSink()) as sink:
+            out.append((grammar.parse(source), sink.diagnostics))
+    return out
+
+
+def check_diagnostics(grammar, sources):
+    broken = [s.replace(';', ' ) ;', 1) for s in sources[:100]]
+    expected = reported(grammar, broken)
+    with tempfile.TemporaryDirectory() as tmp:
+        grammar.cache = ParseCache(directory=tmp)
+        for label in ('miss', 'memory hit'):
+            if reported(grammar, broken) != expected:
+                sys.exit(f'parse() on a cache {label} reports different diagnostics')
+        grammar.cache = ParseCache(directory=tmp)
+        if reported(grammar, broken) != expected:
+            sys.exit('parse() on a disk hit reports different diagnostics')
+    grammar.cache = None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[argv.index('--snippets') + 1]) if '--snippets' in argv else 2000
+    statements = int(argv[argv.index('--statements') + 1]) if '--statements' in argv else 20
+    grammar = get_grammar('function')
+    sources = snippets('function', n, statements)
+    grammar.validate(sources[0])
+    grammar.signature
+    check_diagnostics(grammar, sources)
+
+    rows = [('no cache', per_item(grammar.validate, sources))]
+    with tempfile.TemporaryDirectory() as tmp:
+        grammar.cache = ParseCache(maxsize=n, directory=tmp)
+        rows.append(('first run, cache misses', per_item(grammar.validate, sources)))
+        rows.append(('repeat, memory hits', per_item(grammar.validate, sources)))
+        results = [grammar.validate(s) for s in sources]
+        grammar.cache = ParseCache(maxsize=n, directory=tmp)
+        rows.append(('new process, disk hits', per_item(grammar.validate, sources)))
+        if [grammar.validate(s) for s in sources] != results:
+            sys.exit('cached results differ')
+        counters = grammar.cache.counters
+    rows.append(('hash only', per_item(digest, sources)))
+
+    small = grammar.cache = ParseCache(maxsize=n // 2)
+    per_item(grammar.validate, sources)
+    per_item(grammar.validate, sources)
+    grammar.cache = None
+
+    print(f"{'validate, per snippet':<26} {'us':>9}")
+    for label, seconds in rows:
+        print(f'{label:<26} {seconds * 1e6:9.1f}')
+    print(f'disk-tier cache counters: {counters}')
+    print(f'cache of {n // 2} entries over 2 passes of {n}: {small.counters}')
+
+
+if __name__ == '__main__':
+    main()
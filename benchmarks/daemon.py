@@ -0,0 +1,85 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Checking snippets through the parse daemon vs a fresh interpreter each time.
+#
+# A daemon is started on a temporary socket.  The report compares, per check:
+# a new interpreter that imports miniparsers and checks one snippet (what a
+# pre-commit hook pays without the daemon), the daemon's command line client
+# (interpreter start, no table load), one request over an open connection, and
+# the per-snippet cost when many snippets go in one batched request.
+#
+#   python benchmarks/daemon.py [--runs N] [--batch N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers.daemon import Client  # noqa: E402
+from generators import snippets  # noqa: E402
+
+COLD = '''
+import sys
+import miniparsers
+miniparsers.check('while', sys.stdin.read())
+'''
+
+
+def timed(func, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def wait_for(path, proc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            sys.exit('daemon did not start')
+        time.sleep(0.05)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = int(argv[argv.index('--runs') + 1]) if '--runs' in argv else 10
+    batch = int(argv[argv.index('--batch') + 1]) if '--batch' in argv else 1000
+    sources = snippets('while', batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'daemon.sock')
+        src = os.path.join(tmp, 'snippet.w')
+        with open(src, 'w') as f:
+            f.write(sources[0])
+        server = subprocess.Popen([sys.executable, '-m', 'miniparsers.daemon', 'serve', '--socket', path],
+                                  cwd=ROOT)
+        try:
+            wait_for(path, server)
+            cold = timed(lambda: subprocess.run([sys.executable, '-c', COLD], input=sources[0], cwd=ROOT,
+                                                text=True, check=True), runs)
+            cli = timed(lambda: subprocess.run(
+                [sys.executable, '-m', 'miniparsers.daemon', 'check', '-g', 'while', '--socket', path, src],
+                cwd=ROOT, capture_output=True), runs)
+            with Client(path) as client:
+                if client.check('while', sources) != [{'valid': True, 'errors': []}] * batch:
+                    sys.exit('daemon rejected a generated snippet')
+                single = timed(lambda: client.check('while', sources[:1]), runs * 10)
+                batched = timed(lambda: client.check('while', sources), 3) / batch
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'per check':<32} {'ms':>8}")
+    print(f"{'fresh interpreter':<32} {cold * 1e3:8.2f}")
+    print(f"{'daemon command line client':<32} {cli * 1e3:8.2f}")
+    print(f"{'daemon, open connection':<32} {single * 1e3:8.2f}")
+    print(f"{f'daemon, batches of {batch}':<32} {batched * 1e3:8.3f}")
+
+
+if __name__ == '__main__':
+    main()
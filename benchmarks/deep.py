@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import tracemalloc
+
+# Deeply nested programs through every tree walk.
+#
+# For each dialect a program nests one if (or while, or if-else) inside the
+# next to the given depths.  The parse, node iteration, the optimiser
+# (a miniparsers.walk.Transformer), repr(), unparse() with a re-parse, ==
+# and the VM compiler and interpreter all run on it without recursion.  The
+# unparsed text must parse back to the same tree.  A second pass measures
+# the peak memory of each walk with tracemalloc, which should grow linearly
+# with the depth; the last column divides it by the depth.  A plain
+# recursive walk is shown failing on the same tree.
+#
+#   python benchmarks/deep.py [--depths 10000,100000] [--dialects if,while]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar, vm  # noqa: E402
+from miniparsers.nodes import Node  # noqa: E402
+from miniparsers.optimize import optimize  # noqa: E402
+from miniparsers.walk import dump, iter_nodes, unparse  # noqa: E402
+from generators import DIALECTS  # noqa: E402
+
+
+def nested(dialect, depth):
+    if dialect == 'ifelse':
+        return 'if (x < 1) {\n' * depth + 'x = 1;\n' + '} else { x = 2; }\n' * depth
+    if dialect == 'function':
+        return 'int f(int x) {\n' + 'if (x < 1) {\n' * depth + 'x = x + 1;\n' + '}\n' * depth + 'return x;\n}\n'
+    keyword = 'while' if dialect == 'while' else 'if'
+    return f'{keyword} (x < 1) {{\n' * depth + 'x = 1;\n' + '}\n' * depth
+
+
+def recursive_size(node):
+    if isinstance(node, list):
+        return sum(recursive_size(item) for item in node)
+    if isinstance(node, Node):
+        return 1 + sum(recursive_size(getattr(node, name)) for name in node._fields)
+    return 0
+
+
+def walks(dialect, tree):
+    # name -> function of the tree, in report order
+    steps = {
+        'nodes': lambda: sum(1 for _ in iter_nodes(tree)),
+        'optimize': lambda: optimize(tree),
+        'repr': lambda: repr(tree),
+        'unparse': lambda: unparse(tree),
+    }
+    if dialect != 'function':
+        steps['vm'] = lambda: vm.run(vm.compile_tree(tree))
+    return steps
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def peak(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    depths = [int(d) for d in argv[argv.index('--depths') + 1].split(',')] if '--depths' in argv else [10000, 100000]
+    dialects = argv[argv.index('--dialects') + 1].split(',') if '--dialects' in argv else DIALECTS
+
+    print(f"{'dialect':<9} {'depth':>7} {'nodes':>8} {'parse s':>8} {'iter s':>7} {'opt s':>7} "
+          f"{'repr s':>7} {'unparse s':>9} {'eq s':>6} {'vm s':>6}")
+    memory = []
+    for dialect in dialects:
+        grammar = get_grammar(dialect)
+        for depth in depths:
+            text = nested(dialect, depth)
+            parse, tree = timed(lambda: grammar.parse(text))
+            if tree is None:
+                sys.exit(f'{dialect} at depth {depth}: the program did not parse')
+            times = {}
+            results = {}
+            for name, func in walks(dialect, tree).items():
+                times[name], results[name] = timed(func)
+            if dump(grammar.parse(results['unparse'])) != results['repr']:
+                sys.exit(f'{dialect} at depth {depth}: unparse() does not round-trip')
+            again = grammar.parse(text)
+            equal, same = timed(lambda: tree == again)
+            if not same:
+                sys.exit(f'{dialect} at depth {depth}: two parses of one text are not equal')
+            run = f"{times['vm']:6.2f}" if 'vm' in times else f"{'-':>6}"
+            print(f"{dialect:<9} {depth:7d} {results['nodes']:8d} {parse:8.2f} {times['nodes']:7.2f} "
+                  f"{times['optimize']:7.2f} {times['repr']:7.2f} {times['unparse']:9.2f} {equal:6.2f} {run}")
+            for name, func in walks(dialect, tree).items():
+                memory.append((dialect, depth, name, peak(func)))
+
+    print()
+    print(f"{'dialect':<9} {'depth':>7} {'walk':<9} {'peak KiB':>9} {'bytes/level':>12}")
+    for dialect, depth, name, used in memory:
+        print(f'{dialect:<9} {depth:7d} {name:<9} {used / 1024:9.0f} {used / depth:12.0f}')
+
+    print()
+    tree = get_grammar(dialects[0]).parse(nested(dialects[0], depths[-1]))
+    try:
+        recursive_size(tree)
+        print(f'a recursive walk managed depth {depths[-1]} (recursion limit {sys.getrecursionlimit()})')
+    except RecursionError:
+        print(f'a recursive walk of the same tree raises RecursionError at depth {depths[-1]} '
+              f'(recursion limit {sys.getrecursionlimit()})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import os
+import random
+import sys
+import time
+
+# FastLexer vs the ply.lex lexer built from the same rules.
+#
+# First a differential check: random inputs made of token fragments and stray
+# characters must give the same tokens (type, value, lineno, lexpos), the same
+# t_error calls and the same final line number from both lexers.  Then both
+# lexers are timed on a generated program.
+#
+#   python benchmarks/fastlex.py [--cases N] [--mb N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers.fastlex import FastLexer  # noqa: E402
+from miniparsers.lexer import ply_lexer, reserved  # noqa: E402
+from stream_memory import generate  # noqa: E402
+
+FRAGMENTS = ['if', 'else', 'while', 'int', 'void', 'float', 'return', 'iff', 'x', '_a1', 'else2',
+             '0', '42', '007', '٣٤', '(', ')', '{', '}', '=', '==', '!=', '!', '<', '<=',
+             '>', '>=', '+', '-', '*', ';', ',', '/', '//', '// note\n', ' ', '\t', '\n', '\n\n', '\r',
+             '$', '#', 'é', '.']
+
+
+def run(lexer, text):
+    errors = []
+
+    def lex_error(t):
+        errors.append((t.lexpos, t.lineno, t.value[0]))
+        t.lexer.skip(1)
+
+    lexer.lexerrorf = lex_error
+    lexer.lineno = 1
+    lexer.input(text)
+    tokens = [(t.type, t.value, t.lineno, t.lexpos) for t in iter(lexer.token, None)]
+    return tokens, errors, lexer.lineno
+
+
+def check(cases, seed=0):
+    rng = random.Random(seed)
+    reference, fast = ply_lexer(), FastLexer(reserved)
+    for _ in range(cases):
+        text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(60)))
+        if run(reference, text) != run(fast, text):
+            sys.exit(f'lexers disagree on {text!r}')
+
+
+def throughput(lexer, text, runs=3):
+    best = None
+    for _ in range(runs):
+        lexer.lineno = 1
+        lexer.input(text)
+        start = time.perf_counter()
+        count = 0
+        for _ in iter(lexer.token, None):
+            count += 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, best
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cases = int(argv[argv.index('--cases') + 1]) if '--cases' in argv else 20000
+    mb = float(argv[argv.index('--mb') + 1]) if '--mb' in argv else 2
+
+    check(cases)
+    print(f'{cases} random inputs lexed identically')
+
+    text = ''.join(generate(int(mb * 1024 * 1024)))
+    print(f"{'lexer':<10} {'tokens':>9} {'seconds':>9} {'Mtok/s':>8}")
+    rates = []
+    for label, lexer in (('ply.lex', ply_lexer()), ('FastLexer', FastLexer(reserved))):
+        count, seconds = throughput(lexer, text)
+        rates.append(count / seconds)
+        print(f'{label:<10} {count:9d} {seconds:9.3f} {count / seconds / 1e6:8.2f}')
+    print(f'speedup {rates[1] / rates[0]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import random
+
+# Synthetic programs for every dialect.
+#
+# program(dialect, statements, depth, expr_len, seed) returns the text of a
+# program the dialect's grammar accepts together with the number of statements
+# in it (assignments, returns and every if / if-else / while / nested function,
+# counted once each).  depth is how deeply blocks nest and expr_len is the
+# number of operands in an arithmetic expression.  Expressions mix + - * /
+# and parenthesised groups; a divisor is never the literal 0.  With
+# constants=p, that fraction of conditions compares two literals and of
+# operands is an identity such as (x + 0), for the optimiser to remove.
+#
+#   python benchmarks/generators.py DIALECT [STATEMENTS [DEPTH [EXPR_LEN]]]
+
+DIALECTS = ('if', 'ifelse', 'while', 'function')
+COMPARISONS = ('==', '!=', '<', '>', '<=', '>=')
+NAMES = ('a', 'b', 'count', 'x1', 'total', 'y_2')
+
+# Hand-written loop-heavy while-dialect programs for the execution backends;
+# n scales the work
+LOOPS = {
+    'count': '''
+        i = 0; s = 0;
+        while (i < n) { s = s + i; i = i + 1; }
+    ''',
+    'nested': '''
+        i = 0; s = 0;
+        while (i < n / 100) {
+            j = 0;
+            while (j < 100) {
+                if (j < i) { s = s + j * 2; }
+                j = j + 1;
+            }
+            i = i + 1;
+        }
+    ''',
+    'collatz': '''
+        k = 1; total = 0;
+        while (total < n) {
+            m = k;
+            while (m != 1) {
+                h = m / 2;
+                odd = m - h * 2;
+                if (odd == 0) { m = h; }
+                if (odd == 1) { m = 3 * m + 1; }
+                total = total + 1;
+            }
+            k = k + 1;
+        }
+    ''',
+}
+
+
+class _Writer:
+    def __init__(self, dialect, expr_len, seed, constants=0.0):
+        self.dialect = dialect
+        self.expr_len = expr_len
+        self.constants = constants
+        self.rng = random.Random(seed)
+        self.lines = []
+        self.count = 0
+
+    def operand(self):
+        rng = self.rng
+        if self.constants and rng.random() < self.constants:
+            return f'({rng.choice(NAMES)} {rng.choice(("+ 0", "- 0", "* 1", "/ 1"))})'
+        return rng.choice(NAMES) if rng.random() < 0.6 else str(rng.randrange(1000))
+
+    def expression(self, operands=None):
+        rng = self.rng
+        operands = self.expr_len if operands is None else operands
+        if operands > 2 and rng.random() < 0.2:
+            # A parenthesised group of two or more operands
+            inner = rng.randint(2, operands - 1)
+            group = f'({self.expression(inner)})'
+            rest = self.expression(operands - inner)
+            op = rng.choice('+-*')
+            return f'{group} {op} {rest}' if rng.random() < 0.5 else f'{rest} {op} {group}'
+        parts = [self.operand()]
+        for _ in range(operands - 1):
+            op = rng.choice('+-*/')
+            parts += [op, self.operand() if op != '/' else str(rng.randrange(1, 1000))]
+        return ' '.join(parts)
+
+    def condition(self):
+        rng = self.rng
+        if self.constants and rng.random() < self.constants:
+            return f'{rng.randrange(3)} {rng.choice(COMPARISONS)} {rng.randrange(3)}'
+        return f'{self.expression()} {self.rng.choice(COMPARISONS)} {self.expression()}'
+
+    def emit(self, indent, text):
+        self.lines.append('    ' * indent + text)
+
+    def simple(self, indent, last):
+        self.count += 1
+        if self.dialect == 'function' and last and self.rng.random() < 0.5:
+            self.emit(indent, f'return {self.expression()};')
+        else:
+            self.emit(indent, f'{self.rng.choice(NAMES)} = {self.expression()};')
+
+    def compound(self, indent, inner, depth):
+        # One compound statement holding `inner` statements in its blocks
+        self.count += 1
+        rng = self.rng
+        if self.dialect == 'ifelse':
+            half = rng.randint(1, inner - 1)
+            self.emit(indent, f'if ({self.condition()}) {{')
+            self.block(indent + 1, half, depth - 1)
+            self.emit(indent, '} else {')
+            self.block(indent + 1, inner - half, depth - 1)
+            self.emit(indent, '}')
+            return
+        if self.dialect == 'function' and rng.random() < 0.2:
+            self.emit(indent, f'int f{self.count}(int a, float b) {{')
+        elif self.dialect == 'while' and rng.random() < 0.5:
+            self.emit(indent, f'while ({self.condition()}) {{')
+        else:
+            self.emit(indent, f'if ({self.condition()}) {{')
+        self.block(indent + 1, inner, depth - 1)
+        self.emit(indent, '}')
+
+    def block(self, indent, n, depth):
+        # n statements in total, nested ones included.  The first statement
+        # of a block nests whenever it can, so deep programs reach `depth`
+        rng = self.rng
+        smallest = 2 if self.dialect == 'ifelse' else 1
+        first = True
+        while n > 0:
+            if depth > 0 and n > smallest and (first or rng.random() < 0.3):
+                first = False
+                inner = rng.randint(smallest, min(n - 1, max(smallest, n // 2)))
+                self.compound(indent, inner, depth)
+                n -= inner + 1
+            else:
+                n -= 1
+                self.simple(indent, n == 0)
+
+
+def program(dialect, statements=100, depth=3, expr_len=3, seed=0, constants=0.0):
+    if dialect not in DIALECTS:
+        raise KeyError(f'Unknown dialect {dialect!r}; expected one of {", ".join(DIALECTS)}')
+    w = _Writer(dialect, max(1, expr_len), seed, constants)
+    if dialect == 'while':
+        w.block(0, statements, depth)
+    elif dialect == 'function':
+        w.count += 1
+        w.emit(0, 'int main(int argc, float scale) {')
+        w.block(1, max(1, statements - 1), depth)
+        w.emit(0, '}')
+    else:
+        # The if and if/else dialects parse a single top-level statement
+        w.compound(0, max(2, statements - 1), depth + 1)
+    return '\n'.join(w.lines) + '\n', w.count
+
+
+def snippets(dialect, count, statements=10, depth=2, expr_len=3, seed=0):
+    return [program(dialect, statements, depth, expr_len, seed + i)[0] for i in range(count)]
+
+
+if __name__ == '__main__':
+    import sys
+    args = sys.argv[1:]
+    text, n = program(args[0], *(int(a) for a in args[1:4]))
+    sys.stdout.write(text)
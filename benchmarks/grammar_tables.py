@@ -0,0 +1,66 @@
+import io
+import os
+import re
+import sys
+import tempfile
+import types
+
+# LALR table size and conflicts of every dialect.
+#
+# Each grammar is built from scratch with yacc's debug output enabled, as the
+# original scripts did, and the report lists the number of states, action and
+# goto table entries, shift/reduce and reduce/reduce conflicts and the size of
+# the parser.out file yacc writes.  --no-precedence builds the grammars
+# without their precedence tables to show the conflicts those resolve.
+#
+#   python benchmarks/grammar_tables.py [--no-precedence]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ply.yacc as yacc  # noqa: E402
+
+from miniparsers import get_grammar, grammar_names  # noqa: E402
+
+
+def conflicts(log, kind):
+    m = re.search(r'(\d+) %s conflicts?' % kind, log)
+    return int(m.group(1)) if m else 0
+
+
+def measure(name, precedence=True):
+    module = get_grammar(name).module
+    if not precedence:
+        stripped = types.ModuleType(module.__name__)
+        stripped.__dict__.update((k, v) for k, v in vars(module).items() if k != 'precedence')
+        stripped.__file__ = module.__file__
+        module = stripped
+    with tempfile.TemporaryDirectory() as tmp:
+        out = io.StringIO()
+        debugfile = os.path.join(tmp, 'parser.out')
+        parser = yacc.yacc(module=module, debug=True, debugfile=debugfile, write_tables=False,
+                           errorlog=yacc.PlyLogger(out))
+        size = os.path.getsize(debugfile)
+    log = out.getvalue()
+    return {
+        'states': len(parser.action),
+        'actions': sum(len(row) for row in parser.action.values()),
+        'gotos': sum(len(row) for row in parser.goto.values()),
+        'shift/reduce': conflicts(log, 'shift/reduce'),
+        'reduce/reduce': conflicts(log, 'reduce/reduce'),
+        'parser.out': size,
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    precedence = '--no-precedence' not in argv
+    columns = ['states', 'actions', 'gotos', 'shift/reduce', 'reduce/reduce', 'parser.out']
+    print(f"{'dialect':<9} " + ' '.join(f'{c:>13}' for c in columns))
+    for name in grammar_names():
+        row = measure(name, precedence)
+        print(f'{name:<9} ' + ' '.join(f'{row[c]:13d}' for c in columns))
+
+
+if __name__ == '__main__':
+    main()
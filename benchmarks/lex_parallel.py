@@ -0,0 +1,98 @@
+import os
+import random
+import sys
+import time
+
+# Lexing one large input on a process pool vs in one process.
+#
+# miniparsers.tokbuf.tokenize_parallel() must give the same TokenBuffer as
+# tokenize(), array for array and byte for byte, with the same final line
+# and the same t_error calls in the same order.  This is checked on random
+# inputs with illegal characters and blank lines planted in them.  The
+# checks lower MIN_PARALLEL so that small inputs go through the pool too.
+# The token stream of the first MB must also match the PLY-compatible lexer
+# of Grammar.lexer().  Then a large input is lexed with pools of several
+# sizes.  Speedups depend on the cores the machine has, which are reported
+# with the timings.
+#
+#   python benchmarks/lex_parallel.py [--cases N] [--mb N] [--jobs 2,4]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar, tokbuf  # noqa: E402
+from miniparsers.lexer import reserved  # noqa: E402
+from stream_memory import generate  # noqa: E402
+
+
+def lex(func, text, **options):
+    errors = []
+
+    def lex_error(t):
+        errors.append((t.lexpos, t.lineno, t.value[0]))
+        t.lexer.skip(1)
+
+    buf = func(text, reserved, lex_error, **options)
+    return contents(buf), errors
+
+
+def contents(buf):
+    arrays = tuple(getattr(buf, name).tobytes() for name in ('types', 'starts', 'lengths', 'lines'))
+    return arrays, buf.lineno
+
+
+def check(cases, seed=0):
+    rng = random.Random(seed)
+    saved = tokbuf.MIN_PARALLEL
+    tokbuf.MIN_PARALLEL = 0
+    try:
+        for case in range(cases):
+            chars = list(''.join(generate(rng.randrange(40000), seed=case)))
+            for _ in range(rng.randrange(4)):
+                chars.insert(rng.randrange(len(chars) + 1), rng.choice('@#$\n'))
+            text = ''.join(chars)
+            if lex(tokbuf.tokenize, text) != lex(tokbuf.tokenize_parallel, text, jobs=3):
+                sys.exit(f'case {case}: the parallel TokenBuffer differs from tokenize()')
+    finally:
+        tokbuf.MIN_PARALLEL = saved
+
+
+def stream(grammar, text):
+    lexer = grammar.lexer()
+    lexer.input(text)
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in iter(lexer.token, None)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cases = int(argv[argv.index('--cases') + 1]) if '--cases' in argv else 100
+    mb = float(argv[argv.index('--mb') + 1]) if '--mb' in argv else 16
+    jobs = [int(j) for j in argv[argv.index('--jobs') + 1].split(',')] if '--jobs' in argv else [2, 4]
+
+    check(cases)
+    print(f'{cases} random inputs lexed identically in parallel')
+
+    grammar = get_grammar('while')
+    text = ''.join(generate(int(mb * 1024 * 1024)))
+    head = text[:text.find('\n', 1 << 20) + 1]
+    if [(t.type, t.value, t.lineno, t.lexpos) for t in grammar.tokenize(head, jobs=2)] != stream(grammar, head):
+        sys.exit('the parallel TokenBuffer differs from the lexer')
+    sequential, buf = timed(lambda: grammar.tokenize(text))
+    print(f'{len(buf)} tokens from {mb} MB, {os.cpu_count()} CPU(s)')
+    print(f"{'jobs':>5} {'lex s':>7} {'speedup':>8}")
+    print(f'{1:5d} {sequential:7.2f} {1:7.2f}x')
+    for n in jobs:
+        seconds, result = timed(lambda: grammar.tokenize(text, jobs=n))
+        if contents(result) != contents(buf):
+            sys.exit(f'jobs={n}: the TokenBuffer differs from the sequential one')
+        print(f'{n:5d} {seconds:7.2f} {sequential / seconds:7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import os
+import random
+import sys
+import time
+
+# Line and column lookup through a LineIndex vs scanning back for a newline.
+#
+# On random text, LineIndex.location() must agree with counting newlines and
+# scanning back to the previous one, for every offset, and offset() must
+# invert it.  Diagnostics from check() must carry the same columns.  Then
+# a large input is indexed and random offsets, as many as the errors of a
+# badly broken file, are looked up.  The lookups are timed against the
+# backwards scan (on a sample, since it is linear in the offset), next to the
+# cost of building the index and of lexing the text.
+#
+#   python benchmarks/lines.py [--cases N] [--mb N] [--errors N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.lines import LineIndex  # noqa: E402
+from stream_memory import generate  # noqa: E402
+
+
+def scan(text, pos):
+    # The straightforward way: count lines, then look back for the newline
+    return text.count('\n', 0, pos) + 1, pos - text.rfind('\n', 0, pos)
+
+
+def check(cases, seed=0):
+    rng = random.Random(seed)
+    grammar = get_grammar('while')
+    for case in range(cases):
+        text = ''.join(rng.choice(('x', ' ', '\n', '\n\n', ';', '@', 'y = 1;')) for _ in range(rng.randrange(80)))
+        index = LineIndex(text)
+        for pos in range(len(text) + 1):
+            if index.location(pos) != scan(text, pos) or index.offset(*index.location(pos)) != pos:
+                sys.exit(f'case {case}: LineIndex disagrees at {pos} in {text!r}')
+        for d in grammar.check(text)[1]:
+            if d.pos is not None and (d.line, d.column) != scan(text, d.pos):
+                sys.exit(f'case {case}: {d} has the wrong column')
+        if LineIndex(text.encode()).starts != index.starts:
+            sys.exit(f'case {case}: the index of the bytes differs')
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cases = int(argv[argv.index('--cases') + 1]) if '--cases' in argv else 2000
+    mb = float(argv[argv.index('--mb') + 1]) if '--mb' in argv else 8
+    errors = int(argv[argv.index('--errors') + 1]) if '--errors' in argv else 20000
+
+    check(cases)
+    print(f'{cases} random inputs located identically')
+
+    text = ''.join(generate(int(mb * 1024 * 1024)))
+    rng = random.Random(1)
+    positions = sorted(rng.randrange(len(text)) for _ in range(errors))
+    build, index = timed(lambda: LineIndex(text))
+    lex, _ = timed(lambda: get_grammar('while').tokenize(text))
+    print(f'{mb} MB, {len(index)} lines: index built in {build * 1e3:.0f} ms '
+          f'({index.nbytes() / 2**20:.1f} MB), lexing takes {lex * 1e3:.0f} ms')
+    indexed, found = timed(lambda: [index.location(pos) for pos in positions])
+    sample = positions[::max(1, errors // 200)]
+    scanned, expected = timed(lambda: [scan(text, pos) for pos in sample])
+    if found[::max(1, errors // 200)] != expected:
+        sys.exit('LineIndex disagrees with the scan')
+    per_index = indexed / len(positions)
+    per_scan = scanned / len(sample)
+    print(f'{errors} lookups: {indexed * 1e3:.1f} ms indexed ({per_index * 1e6:.2f} us each); '
+          f'scanning takes {per_scan * 1e6:.0f} us each ({per_scan / per_index:.0f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import os
+import random
+import sys
+import time
+
+# What the optimisation pass removes, what it costs and what it saves.
+#
+# Programs of every dialect are generated with a share of constant conditions
+# and identity operands (generators.program(constants=...)).  For each
+# dialect the report totals, over many programs, the AST size before and
+# after miniparsers.optimize, the time of the pass next to the parse, and the
+# time the reference interpreter needs on both trees.  Run times leave out the
+# while dialect, whose generated loops mostly run into the iteration bound
+# with huge integers.  Small programs check that the optimised tree computes
+# the same variables and return values as the original, and that the
+# original tree is left untouched.  Grammar.run() with and without
+# optimize=True must return the same dict, variables of eliminated code
+# included, unless either run hits the step limit.
+#
+#   python benchmarks/optimize.py [--statements N] [--constants P] [--programs N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.nodes import Node  # noqa: E402
+from miniparsers.optimize import optimize  # noqa: E402
+from miniparsers.vm import LimitExceeded  # noqa: E402
+from generators import DIALECTS, program  # noqa: E402
+from reference import Stop, call, interpret  # noqa: E402
+
+
+def size(tree):
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, Node):
+            count += 1
+            stack.extend(getattr(node, name) for name in node._fields)
+    return count
+
+
+def execute(dialect, tree, args):
+    if dialect == 'function':
+        return call(tree, args, iterations=500)
+    return interpret(tree, {}, iterations=500)
+
+
+def outcome(dialect, tree, args):
+    try:
+        return execute(dialect, tree, args)
+    except Stop:
+        return Stop
+
+
+def vm_result(grammar, text, optimized):
+    try:
+        return grammar.run(text, max_steps=20000, optimize=optimized)
+    except LimitExceeded:
+        return None
+
+
+def same_behaviour(programs, constants):
+    rng = random.Random(0)
+    checked = 0
+    for dialect in DIALECTS:
+        grammar = get_grammar(dialect)
+        for seed in range(programs):
+            text, _ = program(dialect, 30, depth=3, seed=seed, constants=constants)
+            tree = grammar.parse(text)
+            before = repr(tree)
+            optimized, _ = optimize(tree)
+            if repr(tree) != before:
+                sys.exit(f'{dialect} seed {seed}: the optimiser modified its input')
+            args = [rng.randrange(-1000, 1000) for _ in tree.params] if dialect == 'function' else None
+            if outcome(dialect, tree, args) != outcome(dialect, optimized, args):
+                sys.exit(f'{dialect} seed {seed}: the optimised tree behaves differently')
+            if dialect != 'function':
+                plain, fast = vm_result(grammar, text, False), vm_result(grammar, text, True)
+                if plain is not None and fast is not None and plain != fast:
+                    sys.exit(f'{dialect} seed {seed}: run(optimize=True) returns {fast}, not {plain}')
+            checked += 1
+    return checked
+
+
+def timed(func, runs=3):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[argv.index('--statements') + 1]) if '--statements' in argv else 100
+    constants = float(argv[argv.index('--constants') + 1]) if '--constants' in argv else 0.2
+    programs = int(argv[argv.index('--programs') + 1]) if '--programs' in argv else 200
+
+    checked = same_behaviour(programs, constants)
+    print(f'{checked} generated programs behave the same after optimisation')
+
+    print(f'totals over {programs} programs of {n} statements per dialect')
+    print(f"{'dialect':<10} {'nodes':>8} {'after':>8} {'parse ms':>9} {'pass ms':>8} "
+          f"{'run ms':>8} {'after':>8}")
+    for dialect in DIALECTS:
+        grammar = get_grammar(dialect)
+        nodes = remaining = parse = cost = run = after = 0.0
+        for seed in range(programs):
+            text, _ = program(dialect, n, seed=seed, constants=constants)
+            seconds, tree = timed(lambda: grammar.parse(text), 1)
+            parse += seconds
+            seconds, (optimized, _) = timed(lambda: optimize(tree), 1)
+            cost += seconds
+            nodes += size(tree)
+            remaining += size(optimized)
+            if dialect != 'while':
+                args = [1] * len(tree.params) if dialect == 'function' else None
+                seconds, _ = timed(lambda: execute(dialect, tree, args))
+                run += seconds
+                seconds, _ = timed(lambda: execute(dialect, optimized, args))
+                after += seconds
+        times = f'{run * 1e3:8.1f} {after * 1e3:8.1f}' if dialect != 'while' else f"{'-':>8} {'-':>8}"
+        print(f'{dialect:<10} {nodes:8.0f} {remaining:8.0f} {parse * 1e3:9.1f} {cost * 1e3:8.1f} {times}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import os
+import pickle
+import pty
+import subprocess
+import sys
+import threading
+
+# What the console output removed from the parsers used to cost.
+#
+# The while dialect printed "Valid if statement" / "Valid while statement"
+# from its grammar actions, and every p_error and t_error printed its
+# message, whoever was parsing.  Each run below happens in a child process
+# whose stdout is a pipe drained by this one, as when a parse runs under a
+# build tool.  A pipe is block-buffered, so the prints cost little more than
+# formatting the lines; the old prints are also timed on a pseudo-terminal,
+# which Python line-buffers like a console, so that every line is a write
+# to the terminal.  A parse prints about one line per twenty statements, so
+# the saving is smaller than the noise between two parse timings; it is
+# measured instead by timing the lines a parse printed, written on their
+# own to the same stdout.  The old actions are put back by wrapping the two production
+# callables with the print they used to make; the input with errors is parsed
+# with the default (silent) sink, a ListSink and a PrintSink.  The trees must
+# be the same either way.
+#
+#   python benchmarks/quiet.py [--statements N] [--runs N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generators import program  # noqa: E402
+
+CHILD = '''
+import pickle, sys, time
+sys.path.insert(0, {root!r})
+from miniparsers import diagnostics, get_grammar
+grammar = get_grammar('while')
+text = sys.stdin.read()
+mode = {mode!r}
+printed = []
+if mode == 'printing':
+    messages = {{'p_if': 'Valid if statement', 'p_while': 'Valid while statement'}}
+    for prod in grammar.parser.productions:
+        if prod.func in messages:
+            def action(p, func=prod.callable, message=messages[prod.func]):
+                print(message)
+                printed.append(message)
+                func(p)
+            prod.callable = action
+elif mode == 'list':
+    diagnostics.set_sink(diagnostics.ListSink())
+elif mode == 'print':
+    diagnostics.set_sink(diagnostics.PrintSink())
+tree = grammar.parse(text)
+best = float('inf')
+for _ in range({runs}):
+    start = time.perf_counter()
+    grammar.parse(text)
+    best = min(best, time.perf_counter() - start)
+lines = printed[:len(printed) // ({runs} + 1)]
+printing = float('inf')
+for _ in range({runs}):
+    start = time.perf_counter()
+    for line in lines:
+        print(line)
+    sys.stdout.flush()
+    printing = min(printing, time.perf_counter() - start)
+sys.stdout.flush()
+sys.stderr.buffer.write(pickle.dumps((best, tree, printing if lines else 0.0)))
+'''
+
+
+def run(mode, text, runs, tty=False):
+    # (best seconds, tree, lines printed by one parse, seconds to print them)
+    parses = 2 * runs + 1 if mode == 'printing' else runs + 1  # the lines are printed again
+    args = [sys.executable, '-c', CHILD.format(root=ROOT, mode=mode, runs=runs)]
+    if not tty:
+        proc = subprocess.run(args, input=text.encode(), capture_output=True, check=True)
+        seconds, tree, printing = pickle.loads(proc.stderr)
+        return seconds, tree, proc.stdout.count(b'\n') // parses, printing
+    master, slave = pty.openpty()
+    lines = []
+
+    def drain():
+        count = 0
+        while True:
+            try:
+                data = os.read(master, 1 << 16)
+            except OSError:  # EIO once the child has closed the terminal
+                break
+            if not data:
+                break
+            count += data.count(b'\n')
+        lines.append(count)
+
+    reader = threading.Thread(target=drain)
+    reader.start()
+    try:
+        proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=slave, stderr=subprocess.PIPE)
+        os.close(slave)
+        _, err = proc.communicate(text.encode())
+        reader.join()
+    finally:
+        os.close(master)
+    if proc.returncode:
+        sys.exit(err.decode(errors='replace'))
+    seconds, tree, printing = pickle.loads(err)
+    return seconds, tree, lines[0] // parses, printing
+
+
+def broken(text):
+    # Break every tenth assignment by dropping its right-hand side
+    lines = text.split('\n')
+    for i in range(0, len(lines), 10):
+        if '=' in lines[i] and '==' not in lines[i] and lines[i].rstrip().endswith(';'):
+            lines[i] = lines[i].split('=')[0] + '= ;'
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[argv.index('--statements') + 1]) if '--statements' in argv else 50000
+    runs = int(argv[argv.index('--runs') + 1]) if '--runs' in argv else 3
+    text, count = program('while', n, depth=3, seed=0)
+    bad = broken(text)
+
+    rows = []
+    quiet, tree, lines, _ = run('silent', text, runs)
+    rows.append(('valid input, silent', quiet, lines))
+    seconds, old, lines, piped = run('printing', text, runs)
+    if old != tree:
+        sys.exit('the printing actions build a different tree')
+    rows.append(('valid input, old prints', seconds, lines))
+    console, old, lines, printing = run('printing', text, runs, tty=True)
+    if old != tree:
+        sys.exit('the printing actions build a different tree')
+    rows.append(('  ... on a terminal', console, lines))
+    baseline, tree, lines, _ = run('silent', bad, runs)
+    rows.append(('with errors, silent', baseline, lines))
+    for mode in ('list', 'print'):
+        seconds, other, lines, _ = run(mode, bad, runs)
+        if other != tree:
+            sys.exit(f'the {mode} sink changes the tree')
+        rows.append((f'with errors, {mode} sink', seconds, lines))
+
+    print(f'{count} statements, {len(text) / 2**20:.1f} MB')
+    print(f"{'parse':<28} {'ms':>8} {'lines out':>10}")
+    for label, seconds, lines in rows:
+        print(f'{label:<28} {seconds * 1e3:8.1f} {lines:10d}')
+    count = rows[1][2]
+    for label, cost in (('a pipe', piped), ('a terminal', printing)):
+        print(f'the {count} lines of a valid parse took {cost * 1e3:.1f} ms to print to {label} '
+              f'({cost / max(count, 1) * 1e6:.1f} us a line, {cost / quiet:.1%} of a silent parse)')
+
+
+if __name__ == '__main__':
+    main()
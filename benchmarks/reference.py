@@ -0,0 +1,88 @@
+from miniparsers.nodes import Assign, FunctionDef, If, IfElse, Program, Return, While
+
+# Reference semantics for the execution backends (miniparsers.vm and
+# miniparsers.transpile): a plain recursive walk over the AST with variables
+# in a dict.  Unset variables read as 0, / truncates towards zero and a
+# function that ends without a return returns None.  The benchmarks check the
+# backends against it.
+#
+#   interpret(tree, {'n': 10})            # statement program -> variables
+#   call(function_tree, [1, 2])           # function definition -> return value
+
+OPS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a // b if (a < 0) == (b < 0) or a % b == 0 else a // b + 1,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+class Stop(Exception):
+    # Raised when a program runs more loop iterations than it was allowed
+    pass
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class _Walker:
+    def __init__(self, env, iterations):
+        self.env = env
+        self.budget = iterations
+
+    def value(self, node):
+        kind = type(node).__name__
+        if kind == 'Num':
+            return node.value
+        if kind == 'Name':
+            return self.env.get(node.id, 0)
+        return OPS[node.op](self.value(node.left), self.value(node.right))
+
+    def execute(self, body):
+        for node in body:
+            kind = type(node)
+            if kind is Assign:
+                self.env[node.target] = self.value(node.value)
+            elif kind is If:
+                if self.value(node.test):
+                    self.execute(node.body)
+            elif kind is IfElse:
+                self.execute(node.body if self.value(node.test) else node.orelse)
+            elif kind is While:
+                while self.value(node.test):
+                    if self.budget is not None:
+                        self.budget -= 1
+                        if self.budget < 0:
+                            raise Stop
+                    self.execute(node.body)
+            elif kind is Return:
+                raise _Return(self.value(node.value))
+            elif kind is FunctionDef:
+                pass  # nothing can call it
+
+
+def interpret(tree, env, iterations=None):
+    _Walker(env, iterations).execute(tree.body if type(tree) is Program else [tree])
+    return env
+
+
+def call(function, args, iterations=None):
+    env = {param.name: arg for param, arg in zip(function.params, args)}
+    try:
+        _Walker(env, iterations).execute(function.body)
+    except _Return as r:
+        return r.value
+    return None
+
+
+def agree(result, env):
+    # Backends also report variables that are only read, as 0
+    return set(env) <= set(result) and all(env.get(name, 0) == value for name, value in result.items())
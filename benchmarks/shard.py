@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+
+# Sharded parsing of one large file of function definitions.
+#
+# Generated functions are concatenated into one file, with a syntax error
+# planted in every tenth.  The file is parsed in one process (jobs=1) and on
+# process pools of several sizes, with trees and for the diagnostics alone
+# (trees=False).  The pools must return the same tree and diagnostics.
+# Every diagnostic must name the line and column of its offset and point at
+# the token it reports, and every definition must start at its offset.
+# Speedups depend on the cores the machine has, which are reported with the
+# timings.
+#
+#   python benchmarks/shard.py [--functions N] [--statements N] [--jobs 2,4]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.shard import units  # noqa: E402
+from generators import program  # noqa: E402
+
+
+def big_file(functions, statements):
+    parts = ['// generated: one function per unit { }\n']
+    for seed in range(functions):
+        text, _ = program('function', statements, seed=seed)
+        text = text.replace('main', f'f{seed}', 1)
+        if seed % 10 == 3:
+            text = text.replace(';', ' ) ;', 1)
+        parts.append(text)
+    return ''.join(parts)
+
+
+def verify(text, tree, found):
+    for d in found:
+        if d.pos is not None:
+            if d.line != text.count('\n', 0, d.pos) + 1 or d.column != d.pos - text.rfind('\n', 0, d.pos):
+                sys.exit(f'{d}: wrong line or column for its offset')
+            token = d.message.split("'")[1]
+            if not text.startswith(token, d.pos):
+                sys.exit(f'{d}: offset does not point at the reported token')
+    for node in tree.body:
+        if not text.startswith(node.type, node.pos):
+            sys.exit(f'definition at {node.pos}: wrong offset')
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    functions = int(argv[argv.index('--functions') + 1]) if '--functions' in argv else 2000
+    statements = int(argv[argv.index('--statements') + 1]) if '--statements' in argv else 40
+    jobs = [int(j) for j in argv[argv.index('--jobs') + 1].split(',')] if '--jobs' in argv else [2, 4]
+
+    grammar = get_grammar('function')
+    grammar.parser
+    text = big_file(functions, statements)
+    start = time.perf_counter()
+    count = len(units(text))
+    scan = time.perf_counter() - start
+    print(f'{len(text) / 1e6:.1f} MB, {count} units found in {scan * 1e3:.1f} ms, {os.cpu_count()} CPU(s)')
+
+    sequential, (tree, found) = timed(lambda: grammar.parse_sharded(text, jobs=1))
+    verify(text, tree, found)
+    checked, (_, errors) = timed(lambda: grammar.parse_sharded(text, jobs=1, trees=False))
+    if errors != found:
+        sys.exit('trees=False reports different diagnostics')
+    print(f'{len(tree.body)} definitions, {len(found)} errors')
+    print(f"{'jobs':>5} {'trees s':>8} {'speedup':>8} {'errors s':>9} {'speedup':>8}")
+    print(f'{1:5d} {sequential:8.2f} {1:7.2f}x {checked:9.2f} {1:7.2f}x')
+    for n in jobs:
+        seconds, result = timed(lambda: grammar.parse_sharded(text, jobs=n))
+        if result != (tree, found):
+            sys.exit(f'jobs={n}: the sharded parse differs from the sequential one')
+        errors_only, (_, errors) = timed(lambda: grammar.parse_sharded(text, jobs=n, trees=False))
+        if errors != found:
+            sys.exit(f'jobs={n}: the sharded check differs from the sequential one')
+        print(f'{n:5d} {seconds:8.2f} {sequential / seconds:7.2f}x {errors_only:9.2f} {checked / errors_only:7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Cold/warm startup benchmark for the afll*.py scripts.
+#
+# Every script is started as a fresh interpreter, first against an empty table
+# cache (full LALR build) and then several times against the populated cache.
+# The warm runs must not rewrite the cached tables or produce parser.out.
+#
+# The second table times import-to-first-parse inside a fresh interpreter:
+# importing the script as a library and parsing one snippet must stay below
+# the budget, otherwise the benchmark exits with an error.
+#
+#   python benchmarks/startup.py [--runs N] [--budget MS]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One-line programs for the scripts that read their input from stdin
+SAMPLES = {
+    'afll5.py': 'if (x == 1) { x = x + 1; } else { x = 0; }\n',
+    'afll6.py': 'if (x == 1) { x = x + 1; }\n',
+    'afll7.py': 'while (x < 5) { x = x + 1; }\n',
+    'afll8.py': 'int f(int a) { return a; }\n',
+    'afll9.py': 'int f(int a, int b) { return a + b; }\n',
+}
+
+SCRIPTS = ['afll.py'] + [f'afll{i}.py' for i in range(1, 10)]
+
+# Snippet parsed after import, per script
+SNIPPETS = {
+    'afll.py': SAMPLES['afll5.py'],
+    'afll1.py': SAMPLES['afll6.py'],
+    'afll2.py': SAMPLES['afll7.py'],
+    'afll3.py': SAMPLES['afll8.py'],
+    'afll4.py': SAMPLES['afll9.py'],
+}
+SNIPPETS.update(SAMPLES)
+
+BUDGET_MS = 100
+
+FIRST_PARSE = '''
+import time
+start = time.perf_counter()
+import {module}
+{module}.parse({snippet!r})
+print(time.perf_counter() - start)
+'''
+
+
+def run(script, cache_dir):
+    env = dict(os.environ, AFLL_TABLE_DIR=cache_dir)
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(ROOT, script)], input=SAMPLES.get(script, ''),
+                   env=env, cwd=cache_dir, text=True, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def first_parse(script, cache_dir):
+    env = dict(os.environ, AFLL_TABLE_DIR=cache_dir)
+    code = FIRST_PARSE.format(module=script[:-3], snippet=SNIPPETS[script])
+    proc = subprocess.run([sys.executable, '-c', code], env=env, cwd=ROOT,
+                          text=True, capture_output=True, check=True)
+    return float(proc.stdout.split()[-1])
+
+
+def snapshot(cache_dir):
+    return dict((entry, os.stat(os.path.join(cache_dir, entry)).st_mtime_ns)
+                for entry in os.listdir(cache_dir))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    runs = int(argv[argv.index('--runs') + 1]) if '--runs' in argv else 5
+    budget = float(argv[argv.index('--budget') + 1]) if '--budget' in argv else BUDGET_MS
+
+    print(f"{'script':<10} {'cold ms':>9} {'warm ms':>9} {'saved':>7}")
+    for script in SCRIPTS:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold = run(script, cache_dir)
+            before = snapshot(cache_dir)
+            warm = statistics.median(run(script, cache_dir) for _ in range(runs))
+            after = snapshot(cache_dir)
+
+            if before != after:
+                sys.exit(f'{script}: warm start rewrote the table cache')
+            for debug_file in ('parser.out', 'parsetab.py'):
+                if os.path.exists(os.path.join(cache_dir, debug_file)):
+                    sys.exit(f'{script}: wrote {debug_file}')
+
+        print(f'{script:<10} {cold * 1000:9.1f} {warm * 1000:9.1f} {1 - warm / cold:7.0%}')
+
+    print()
+    print(f"{'script':<10} {'first parse ms':>15}   (budget {budget:.0f} ms)")
+    over = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for script in SCRIPTS:
+            first_parse(script, cache_dir)  # populate the table cache
+            elapsed = statistics.median(first_parse(script, cache_dir) for _ in range(runs)) * 1000
+            print(f'{script:<10} {elapsed:15.1f}')
+            if elapsed > budget:
+                over.append(script)
+    if over:
+        sys.exit(f"import-to-first-parse over budget: {', '.join(over)}")
+
+
+if __name__ == '__main__':
+    main()
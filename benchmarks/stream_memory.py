@@ -0,0 +1,120 @@
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+# Peak memory of streaming vs whole-input parsing.
+#
+# Writes a generated while-dialect program of the requested size, then parses
+# it in fresh interpreters: once after sys.stdin.read()-style loading, once
+# through Grammar.parse_stream() and once through Grammar.check_stream().
+# parse_stream() does not hold the text, but it still builds the tree of all
+# of it; only check_stream(), which runs the recognizer and builds no tree,
+# stays within one chunk and the parser stacks.  Before that, the token
+# stream of the StreamLexer is compared with the in-memory lexer for tiny
+# chunk sizes, so every kind of token ends up straddling a chunk boundary,
+# and check_stream() must report the diagnostics of check() on the text with
+# syntax and lexical errors in it.
+#
+#   python benchmarks/stream_memory.py [--mb N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.stream import StreamLexer  # noqa: E402
+
+STATEMENTS = [
+    'x = x + 1;\n',
+    'counter_{n} = counter_{n} - {n}; // step {n}\n',
+    'if (x <= {n}) {{ y = y + {n}; }}\n',
+    'while (y != {n}) {{\n  y = y - 1;\n}}\n',
+    'if (a == b) {{ a = a + 1; }} // ==\n',
+]
+
+CHILD = '''
+import os, resource, sys, time
+sys.path.insert(0, {root!r})
+from miniparsers import get_grammar
+grammar = get_grammar('while')
+grammar.parser
+start = time.perf_counter()
+with open({path!r}) as f:
+    if {mode!r} == 'stream':
+        grammar.parse_stream(f)
+    elif {mode!r} == 'check':
+        grammar.check_stream(f)
+    else:
+        grammar.parse(f.read())
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stdout)
+'''
+
+
+def generate(size, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size:
+        stmt = rng.choice(STATEMENTS).format(n=rng.randrange(1000))
+        parts.append(stmt)
+        total += len(stmt)
+        if len(parts) == 4096:
+            yield ''.join(parts)
+            parts = []
+    yield ''.join(parts)
+
+
+def signature(tok):
+    return tok.type, tok.value, tok.lineno, tok.lexpos
+
+
+def check():
+    grammar = get_grammar('while')
+    text = ''.join(generate(20000, seed=1))
+    lexer = grammar.lexer()
+    lexer.input(text)
+    expected = [signature(t) for t in iter(lexer.token, None)]
+    for chunk_size in range(1, 8):
+        got = [signature(t) for t in StreamLexer(grammar.lexer(), io.StringIO(text), chunk_size)]
+        if got != expected:
+            raise SystemExit(f'stream lexer differs from lexer with chunk size {chunk_size}')
+    broken = text.replace('= ', '= ) ', 40).replace('x + 1;', 'x + @;', 20)
+    _, found = grammar.check(broken)
+    for chunk_size in (1, 7, 4096):
+        got = grammar.check_stream(io.StringIO(broken), chunk_size)
+        if [(d, d.column) for d in got] != [(d, d.column) for d in found]:
+            raise SystemExit(f'check_stream() differs from check() with chunk size {chunk_size}')
+    return len(expected), len(found)
+
+
+def measure(path, mode):
+    code = CHILD.format(root=ROOT, path=path, mode=mode)
+    out = subprocess.run([sys.executable, '-c', code], text=True, capture_output=True, check=True).stdout
+    seconds, maxrss = out.split()
+    return float(seconds), int(maxrss) / 1024
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    mb = float(argv[argv.index('--mb') + 1]) if '--mb' in argv else 10
+
+    count, errors = check()
+    print(f'token streams match ({count} tokens, chunk sizes 1-7)')
+    print(f'check_stream() reports the {errors} errors of check()')
+
+    with tempfile.NamedTemporaryFile('w', suffix='.c', delete=False) as f:
+        for block in generate(int(mb * 1024 * 1024)):
+            f.write(block)
+    try:
+        print(f"{'mode':<8} {'seconds':>9} {'peak RSS MB':>12}   ({mb:g} MB input)")
+        for mode in ('read', 'stream', 'check'):
+            seconds, rss = measure(f.name, mode)
+            print(f'{mode:<8} {seconds:9.2f} {rss:12.1f}')
+    finally:
+        os.remove(f.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# Throughput benchmark suite for every dialect.
+#
+# For each dialect a program is generated (see generators.py) and measured:
+#
+#   lex_tokens_per_s        shared lexer over the whole program, best of --runs
+#   parse_statements_per_s  grammar.parse() of the whole program, best of --runs
+#   p50_us / p99_us         parse latency of small generated snippets
+#   peak_memory_mb          tracemalloc peak while parsing the whole program
+#
+# Results can be written as JSON and a later run compared against them:
+#
+#   python benchmarks/suite.py --json before.json
+#   python benchmarks/suite.py --compare before.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from generators import DIALECTS, program, snippets  # noqa: E402
+
+# metric -> True if higher is better
+METRICS = {
+    'lex_tokens_per_s': True,
+    'parse_statements_per_s': True,
+    'p50_us': False,
+    'p99_us': False,
+    'peak_memory_mb': False,
+}
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def best(func, runs):
+    seconds = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    return seconds
+
+
+def lex_all(grammar, text):
+    lexer = grammar.lexer()
+    lexer.input(text)
+    count = 0
+    for _ in iter(lexer.token, None):
+        count += 1
+    return count
+
+
+def measure(name, args):
+    grammar = get_grammar(name)
+    text, statements = program(name, args.statements, args.depth, args.expr_len, args.seed)
+    small = snippets(name, args.snippets, args.snippet_statements, min(args.depth, 2), args.expr_len,
+                     args.seed)
+    grammar.parse(small[0])  # build or load the tables outside the timings
+
+    tokens = lex_all(grammar, text)
+    lex = best(lambda: lex_all(grammar, text), args.runs)
+    parse = best(lambda: grammar.parse(text), args.runs)
+
+    latencies = []
+    for snippet in small:
+        start = time.perf_counter()
+        grammar.parse(snippet)
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+    tracemalloc.start()
+    grammar.parse(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'bytes': len(text),
+        'tokens': tokens,
+        'statements': statements,
+        'lex_tokens_per_s': tokens / lex,
+        'parse_statements_per_s': statements / parse,
+        'p50_us': percentile(latencies, 0.50),
+        'p99_us': percentile(latencies, 0.99),
+        'peak_memory_mb': peak / 2**20,
+    }
+
+
+def report(results, baseline=None):
+    header = f"{'dialect':<9} {'tokens/s':>10} {'stmts/s':>9} {'p50 us':>8} {'p99 us':>8} {'peak MB':>8}"
+    print(header)
+    for name, r in results.items():
+        print(f"{name:<9} {r['lex_tokens_per_s']:10.0f} {r['parse_statements_per_s']:9.0f} "
+              f"{r['p50_us']:8.1f} {r['p99_us']:8.1f} {r['peak_memory_mb']:8.1f}")
+        if baseline and name in baseline:
+            old = baseline[name]
+            changes = [f'{metric} {r[metric] / old[metric]:.2f}x'
+                       for metric in METRICS if old.get(metric)]
+            print(f"{'':<9} vs baseline: {', '.join(changes)}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Lexer and parser throughput for every dialect.')
+    ap.add_argument('--dialect', action='append', choices=DIALECTS,
+                    help='dialect to measure (repeatable; default all)')
+    ap.add_argument('--statements', type=int, default=20000, help='statements in the large program')
+    ap.add_argument('--depth', type=int, default=3, help='block nesting depth')
+    ap.add_argument('--expr-len', type=int, default=3, help='operands per arithmetic expression')
+    ap.add_argument('--snippets', type=int, default=2000, help='snippets for the latency percentiles')
+    ap.add_argument('--snippet-statements', type=int, default=10, help='statements per snippet')
+    ap.add_argument('--runs', type=int, default=3, help='timed runs; the best one counts')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--json', metavar='PATH', help='write the results to PATH')
+    ap.add_argument('--compare', metavar='PATH', help='compare against the results in PATH')
+    args = ap.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    for name in args.dialect or DIALECTS:
+        results[name] = measure(name, args)
+    report(results, baseline)
+
+    if args.json:
+        params = {k: v for k, v in vars(args).items() if k not in ('json', 'compare')}
+        with open(args.json, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'params': params,
+                'results': results,
+            }, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# TokenBuffer vs a list of token objects.
+#
+# The buffer must hold the same tokens (type, value, lineno, lexpos), make the
+# same t_error calls and end on the same line as FastLexer for random inputs,
+# and parsing from it must give the same AST as parsing from the lexer.  Then
+# the memory held by a lexed program and the time to lex and parse it are
+# compared for both representations.  Parsing a buffer that is already
+# filled costs about what parsing with the lexer does, but the buffer is
+# filled in a pass of its own, so from text to tree it is slower by the time
+# of that pass; the last column shows it.
+#
+#   python benchmarks/tokbuf.py [--cases N] [--mb N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.fastlex import FastLexer  # noqa: E402
+from miniparsers.lexer import reserved  # noqa: E402
+from miniparsers.tokbuf import tokenize  # noqa: E402
+from fastlex import FRAGMENTS, run  # noqa: E402
+from stream_memory import generate  # noqa: E402
+
+
+def run_buffer(text):
+    errors = []
+
+    def lex_error(t):
+        errors.append((t.lexpos, t.lineno, t.value[0]))
+        t.lexer.skip(1)
+
+    buf = tokenize(text, reserved, lex_error)
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in buf], errors, buf.lineno
+
+
+def check(cases, seed=0):
+    rng = random.Random(seed)
+    lexer = FastLexer(reserved)
+    for _ in range(cases):
+        text = ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(60)))
+        if run(lexer, text) != run_buffer(text):
+            sys.exit(f'TokenBuffer disagrees with FastLexer on {text!r}')
+
+
+def tokens(grammar, text):
+    lexer = grammar.lexer()
+    lexer.input(text)
+    return iter(lexer.token, None)
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    result = func()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return seconds, held
+
+
+def timed(func, runs=3):
+    # Best of runs, the timings on a busy machine being noisy
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    cases = int(argv[argv.index('--cases') + 1]) if '--cases' in argv else 5000
+    mb = float(argv[argv.index('--mb') + 1]) if '--mb' in argv else 2
+
+    check(cases)
+    print(f'{cases} random inputs buffered identically')
+
+    grammar = get_grammar('while')
+    text = ''.join(generate(int(mb * 1024 * 1024)))
+    if grammar.parse(text) != grammar.parse_tokens(grammar.tokenize(text)):
+        sys.exit('parsing from the TokenBuffer gives a different AST')
+
+    count = len(grammar.tokenize(text))
+    print(f'{count} tokens from {mb} MB')
+    # parse s: the parser reading tokens as they are lexed (objects) or from
+    # a filled buffer; text->tree s: from the text, lexing included
+    print(f"{'tokens as':<12} {'lex s':>7} {'held MB':>8} {'B/token':>8} {'parse s':>8} {'text->tree s':>13}")
+    buf = grammar.tokenize(text)
+    rows = (('objects', lambda: list(tokens(grammar, text)), lambda: grammar.parse(text),
+             lambda: grammar.parse(text)),
+            ('TokenBuffer', lambda: grammar.tokenize(text), lambda: grammar.parse_tokens(buf),
+             lambda: grammar.parse_tokens(grammar.tokenize(text))))
+    totals = []
+    for label, lex, parse, whole in rows:
+        seconds, held = measure(lex)
+        parse_seconds = timed(parse)
+        totals.append(timed(whole))
+        print(f'{label:<12} {seconds:7.3f} {held / 2**20:8.1f} {held / count:8.1f} {parse_seconds:8.3f} '
+              f'{totals[-1]:13.3f}')
+    print(f'from text to tree the TokenBuffer takes {totals[1] / totals[0] - 1:+.0%} of the time of the lexer')
+
+
+if __name__ == '__main__':
+    main()
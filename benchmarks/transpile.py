@@ -0,0 +1,95 @@
+import os
+import random
+import sys
+import time
+
+# Running programs as compiled Python code vs the VM vs walking the tree.
+#
+# Generated programs of every dialect are transpiled (miniparsers.transpile)
+# and checked against the reference interpreter in benchmarks/reference.py:
+# statement programs must end with the same variables and functions must
+# return the same values for random arguments.  Generated loops that never
+# end within an iteration bound are skipped, since compiled code has no step
+# limit.  Then the loop-heavy programs of benchmarks/generators.py are timed
+# on all three, and transpiling a function is timed cold and from the cache.
+#
+#   python benchmarks/transpile.py [--scale N] [--programs N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers import vm  # noqa: E402
+from miniparsers.transpile import codes  # noqa: E402
+from generators import LOOPS, program  # noqa: E402
+from reference import Stop, agree, call, interpret  # noqa: E402
+
+
+def best(func, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def differential(programs):
+    checked = skipped = 0
+    rng = random.Random(0)
+    for dialect in ('if', 'ifelse', 'while', 'function'):
+        grammar = get_grammar(dialect)
+        for seed in range(programs):
+            text, _ = program(dialect, 30, depth=3, expr_len=3, seed=seed)
+            tree = grammar.parse(text)
+            compiled = grammar.transpile(text)
+            if dialect == 'function':
+                for _ in range(5):
+                    args = [rng.randrange(-1000, 1000) for _ in tree.params]
+                    if compiled(*args) != call(tree, args):
+                        sys.exit(f'{dialect} seed {seed}: compiled code and the interpreter disagree')
+                checked += 1
+                continue
+            try:
+                expected = interpret(tree, {}, iterations=500)
+            except Stop:
+                skipped += 1
+                continue
+            if not agree(compiled({}), expected):
+                sys.exit(f'{dialect} seed {seed}: compiled code and the interpreter disagree')
+            checked += 1
+    return checked, skipped
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    scale = int(argv[argv.index('--scale') + 1]) if '--scale' in argv else 100000
+    programs = int(argv[argv.index('--programs') + 1]) if '--programs' in argv else 200
+
+    checked, skipped = differential(programs)
+    print(f'{checked} generated programs agree with the interpreter ({skipped} never finish, skipped)')
+
+    grammar = get_grammar('while')
+    print(f"{'program':<10} {'tree-walk s':>12} {'VM s':>8} {'Python s':>9} {'vs walk':>8} {'vs VM':>6}")
+    for name, text in LOOPS.items():
+        variables = {'n': scale}
+        walk, expected = best(lambda: interpret(grammar.parse(text), dict(variables)))
+        code = grammar.compile(text)
+        machine, result = best(lambda: vm.run(code, variables))
+        compiled = grammar.transpile(text)
+        python, native = best(lambda: compiled(variables))
+        if not (agree(result, expected) and agree(native, expected)):
+            sys.exit(f'{name}: the backends disagree')
+        print(f'{name:<10} {walk:12.3f} {machine:8.3f} {python:9.3f} {walk / python:7.1f}x {machine / python:5.1f}x')
+
+    function = get_grammar('function')
+    text, count = program('function', 500, seed=1)
+    codes.clear()
+    cold, _ = best(lambda: function.transpile(text), runs=1)
+    warm, _ = best(lambda: function.transpile(text), runs=20)
+    print(f'transpiling a {count}-statement function: {cold * 1e3:.1f} ms, '
+          f'{warm * 1e3:.3f} ms from the code cache')
+
+
+if __name__ == '__main__':
+    main()
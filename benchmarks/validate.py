@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+import time
+
+# Recognizer throughput vs parser.parse() for every dialect.
+#
+# Each dialect gets a generated program of the requested number of statements.
+# validate() must agree with a full parse on the program and on randomly
+# truncated copies of it before anything is timed.
+#
+#   python benchmarks/validate.py [--statements N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.batch import check_source  # noqa: E402
+
+
+def statements(rng, n, keywords, expression):
+    out = []
+    for i in range(n):
+        kind = rng.choice(keywords)
+        if kind == 'assign':
+            out.append(f'x{i % 7} = {expression(rng)};')
+        else:
+            out.append(f'{kind} (x{i % 5} < {i}) {{ y = {expression(rng)}; }}')
+    return '\n'.join(out)
+
+
+def full_expression(rng):
+    return ' + '.join(rng.choice(['a', 'b', '1', '42']) for _ in range(rng.randint(1, 4)))
+
+
+def simple_expression(rng):
+    return rng.choice(['a', '7', 'a + 1', 'b - 2'])
+
+
+def program(dialect, n, seed=0):
+    rng = random.Random(seed)
+    if dialect == 'while':
+        return statements(rng, n, ['assign', 'if', 'while'], full_expression)
+    if dialect == 'if':
+        return f'if (x == 1) {{\n{statements(rng, n, ["assign", "if"], full_expression)}\n}}'
+    if dialect == 'ifelse':
+        body = statements(rng, n // 2, ['assign'], simple_expression)
+        return f'if (x == 1) {{\n{body}\n}} else {{\n{body}\n}}'
+    body = statements(rng, n, ['assign', 'if'], full_expression)
+    return f'int f(int a, int b) {{\n{body}\nreturn a;\n}}'
+
+
+def agree(grammar, text):
+    return grammar.validate(text) == (not check_source(grammar, text))
+
+
+def timed(func, text):
+    start = time.perf_counter()
+    func(text)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[argv.index('--statements') + 1]) if '--statements' in argv else 20000
+    rng = random.Random(1)
+
+    print(f"{'dialect':<10} {'parse stmt/s':>13} {'validate stmt/s':>16} {'speedup':>8}")
+    for name in ('if', 'ifelse', 'while', 'function'):
+        grammar = get_grammar(name)
+        text = program(name, n)
+        samples = [program(name, 20, seed)[:rng.randrange(200)] for seed in range(200)]
+        if not all(agree(grammar, sample) for sample in [text] + samples):
+            sys.exit(f'{name}: validate() disagrees with parse()')
+
+        parse = min(timed(grammar.parse, text) for _ in range(3))
+        validate = min(timed(grammar.validate, text) for _ in range(3))
+        print(f'{name:<10} {n / parse:13.0f} {n / validate:16.0f} {parse / validate:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+# Running if/while programs on the bytecode VM vs walking the tree.
+#
+# A few loop-heavy programs are run on miniparsers.vm and on the reference
+# interpreter in benchmarks/reference.py, which walks the AST and keeps
+# variables in a dict.  Both must end with the same variables.  Generated
+# programs of every if/while dialect are checked the same way, with an
+# iteration bound so that generated loops that never end are skipped.
+#
+#   python benchmarks/vm.py [--scale N] [--programs N]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from miniparsers import get_grammar  # noqa: E402
+from miniparsers.vm import LimitExceeded, run  # noqa: E402
+from generators import LOOPS, program  # noqa: E402
+from reference import Stop, agree, interpret  # noqa: E402
+
+
+def best(func, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def differential(programs):
+    checked = skipped = 0
+    for dialect in ('if', 'ifelse', 'while'):
+        grammar = get_grammar(dialect)
+        for seed in range(programs):
+            text, _ = program(dialect, 30, depth=3, expr_len=3, seed=seed)
+            tree = grammar.parse(text)
+            try:
+                expected = interpret(tree, {}, iterations=500)
+            except Stop:
+                try:
+                    run(grammar.compile(text), max_steps=2000)
+                except LimitExceeded:
+                    skipped += 1
+                    continue
+                sys.exit(f'{dialect} seed {seed}: the VM finished a program that loops')
+            if not agree(run(grammar.compile(text)), expected):
+                sys.exit(f'{dialect} seed {seed}: the VM and the interpreter disagree')
+            checked += 1
+    return checked, skipped
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    scale = int(argv[argv.index('--scale') + 1]) if '--scale' in argv else 100000
+    programs = int(argv[argv.index('--programs') + 1]) if '--programs' in argv else 200
+
+    checked, skipped = differential(programs)
+    print(f'{checked} generated programs agree with the interpreter ({skipped} never finish, skipped)')
+
+    grammar = get_grammar('while')
+    print(f"{'program':<10} {'bytecode':>13} {'tree-walk s':>12} {'VM s':>8} {'speedup':>8}")
+    for name, text in LOOPS.items():
+        code = grammar.compile(text)
+        walk, expected = best(lambda: interpret(grammar.parse(text), {'n': scale}))
+        vm, result = best(lambda: run(code, {'n': scale}))
+        if not agree(result, expected):
+            sys.exit(f'{name}: the VM and the interpreter disagree')
+        print(f'{name:<10} {len(code):13d} {walk:12.3f} {vm:8.3f} {walk / vm:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
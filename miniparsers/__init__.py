@@ -0,0 +1,6 @@
+from .lexer import get_lexer
+from .diagnostics import Diagnostic
+from .registry import Grammar, check, get_grammar, get_parser, grammar_names, parse, register, validate
+
+__all__ = ['Diagnostic', 'Grammar', 'check', 'get_grammar', 'get_lexer', 'get_parser', 'grammar_names',
+           'parse', 'register', 'validate']
@@ -0,0 +1,143 @@
+import argparse
+import os
+import py_compile
+import sys
+import tempfile
+
+from . import lexer
+from .cache import reflected_signature
+from .registry import get_grammar, grammar_names
+from .tables import COMPILED, compiled_lextab, compiled_tables, reflect, source_digest
+
+# Ahead-of-time lexer and parser tables.
+#
+#   python -m miniparsers.aot [GRAMMAR ...] [--check]
+#
+# PLY builds the lexer from the regexes of the t_ rules and the LALR tables
+# from the docstrings of the p_ rules.  python -OO strips docstrings, so
+# neither can be built in a production image that runs with it.  This step,
+# run without -OO (at image build time, say), writes the tables into the
+# miniparsers.compiled package as plain Python literals:
+#
+#   <grammar>_parsetab.py   the LALR tables of one dialect, with the grammar
+#                           signature Grammar.signature would compute
+#   lextab.py               the ply.lex tables of the shared lexer
+#
+# The modules are byte-compiled for plain and -OO runs as they are written,
+# so an image with a read-only tree does not compile them on every start.
+# Every module records a digest of the sources it was built from.
+# tables.build_parser() and lexer.ply_lexer() load a module whose digest
+# matches without reflecting over the grammar or its rules, about as fast as
+# the pickled tables and without a writable cache directory; a module built
+# from other sources is ignored.  With --check nothing is written and the
+# exit status says whether every module is present and current.
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), COMPILED.rsplit('.', 1)[1])
+
+HEADER = '# Generated by python -m miniparsers.aot from {source}.  Do not edit.\n'
+
+
+def parse_tables(grammar):
+    # Source of the <grammar>_parsetab module
+    import ply.yacc as yacc  # deferred so importing stays cheap
+    module = grammar.module
+    pinfo = reflect(module)
+    parser = yacc.yacc(module=module, debug=False, write_tables=False)
+    lines = [HEADER.format(source=os.path.basename(module.__file__)),
+             f'_tabversion = {yacc.__tabversion__!r}',
+             "_lr_method = 'LALR'",
+             f'_lr_signature = {pinfo.signature()!r}',
+             f'_source = {source_digest(module)!r}',
+             f'_signature = {reflected_signature(grammar)!r}',
+             '',
+             '_lr_action = {']
+    lines += [f'    {state!r}: {row!r},' for state, row in sorted(parser.action.items())]
+    lines += ['}', '', '_lr_goto = {']
+    lines += [f'    {state!r}: {row!r},' for state, row in sorted(parser.goto.items())]
+    lines += ['}', '', '_lr_productions = [']
+    for p in parser.productions:
+        if p.func:
+            entry = (p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line)
+        else:
+            entry = (str(p), p.name, p.len, None, None, None)
+        lines.append(f'    {entry!r},')
+    lines.append(']')
+    return '\n'.join(lines) + '\n'
+
+
+def lex_tables():
+    # Source of the lextab module, in the format of ply.lex's own lextab files
+    import ply.lex as lex  # deferred so importing stays cheap
+    built = lex.lex(module=lexer)
+    with tempfile.TemporaryDirectory() as tmp:
+        built.writetab('lextab', tmp)
+        with open(os.path.join(tmp, 'lextab.py')) as f:
+            text = f.read()
+    return (HEADER.format(source='lexer.py') + text +
+            f'_source = {source_digest(lexer, ())!r}\n')
+
+
+def write(path, text):
+    # Under a private name and renamed, like the pickled tables
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+    for level in (0, 2):
+        py_compile.compile(path, optimize=level, doraise=True)
+
+
+def stale(names):
+    # Names of the modules that are missing or were built from other sources
+    out = [] if compiled_lextab() is not None else ['lextab']
+    for name in names:
+        grammar = get_grammar(name)
+        if compiled_tables(grammar.module, name) is None:
+            out.append(f'{name}_parsetab')
+    return out
+
+
+def build(names, output_dir=None):
+    # Write the modules for the named grammars and the lexer; returns their paths
+    output_dir = output_dir or OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    init = os.path.join(output_dir, '__init__.py')
+    if not os.path.exists(init):
+        write(init, HEADER.format(source='the miniparsers sources'))
+    paths = [os.path.join(output_dir, 'lextab.py')]
+    write(paths[0], lex_tables())
+    for name in names:
+        path = os.path.join(output_dir, f'{name}_parsetab.py')
+        write(path, parse_tables(get_grammar(name)))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m miniparsers.aot',
+                                 description='Write the lexer and parser tables of the dialects as '
+                                             'Python modules that load without docstrings (python -OO).')
+    ap.add_argument('grammars', nargs='*', metavar='GRAMMAR',
+                    help=f"dialects to build (default: all of {', '.join(grammar_names())})")
+    ap.add_argument('--check', action='store_true',
+                    help='write nothing; exit with status 1 if a module is missing or out of date')
+    args = ap.parse_args(argv)
+
+    names = args.grammars or grammar_names()
+    unknown = sorted(set(names) - set(grammar_names()))
+    if unknown:
+        ap.error(f"unknown grammar(s): {', '.join(unknown)}")
+    if sys.flags.optimize >= 2:
+        ap.error('the tables are built from docstrings: run without -OO')
+    if args.check:
+        missing = stale(names)
+        for name in missing:
+            print(f'{COMPILED}.{name}: missing or out of date')
+        return 1 if missing else 0
+    for path in build(names):
+        print(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
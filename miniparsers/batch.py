@@ -0,0 +1,185 @@
+import argparse
+import fnmatch
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .bytelex import map_file
+from .cache import ParseCache
+from .diagnostics import Diagnostic
+from .registry import get_grammar, grammar_names
+
+# Batch validation of many source files.
+#
+#   python -m miniparsers.batch -g function src/ more/file.txt
+#   find src -name '*.c' | python -m miniparsers.batch -g while --files-from - --format json
+#
+# Files are handed to a process pool in chunks.  Every worker builds its parser
+# once when it starts and maps each file with mmap.  The next file of a chunk
+# is mapped and paged in on a helper thread while the current one is being
+# parsed.  A mapped UTF-8 file is decoded in one call and lexed by the shared
+# FastLexer, which is faster than lexing the bytes with the ByteLexer of
+# miniparsers.bytelex (benchmarks/bytelex.py); only files that are not UTF-8
+# are lexed as bytes, with byte offsets in their records.  Records of other
+# files have character offsets, like check() on a str.  Results are
+# written as JSON lines (one record per file followed by a summary record) or
+# as one JSON document.
+
+CHUNK_SIZE = 64
+
+_grammar = None
+_reader = None
+
+
+def check_source(grammar, text):
+    # Parse text (str or a bytes-like buffer) and return all of its lexical and
+    # syntax errors instead of printing them
+    return [d.as_dict() for d in grammar.check(text)[1]]
+
+
+def decoded(data):
+    # The text of a mapped file, or the buffer itself if it is not UTF-8
+    try:
+        return str(data, 'utf-8')
+    except UnicodeDecodeError:
+        return data
+
+
+def check_file(grammar, path, data):
+    if isinstance(data, OSError):
+        # A file that cannot be read gets a record of the same shape as a
+        # syntax error, of kind 'io' and without a position
+        error = Diagnostic('io', str(data), None, None)
+        return {'path': path, 'valid': False, 'errors': [error.as_dict()]}
+    try:
+        text = decoded(data)
+        # Most files are valid: recognize first, parse again only to report errors
+        errors = [] if grammar.validate(text) else check_source(grammar, text)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return {'path': path, 'valid': not errors, 'errors': errors}
+
+
+def _map_or_error(path):
+    try:
+        data = map_file(path)
+    except OSError as e:
+        return e
+    if isinstance(data, mmap.mmap) and hasattr(mmap, 'MADV_WILLNEED'):
+        data.madvise(mmap.MADV_WILLNEED)
+    return data
+
+
+def _init_worker(name, cache_dir=None):
+    global _grammar, _reader
+    _grammar = get_grammar(name)
+    _grammar.parser
+    if cache_dir:
+        _grammar.cache = ParseCache(directory=cache_dir)
+    _reader = ThreadPoolExecutor(max_workers=1)
+
+
+def _check_chunk(paths):
+    results = []
+    pending = _reader.submit(_map_or_error, paths[0])
+    for i, path in enumerate(paths):
+        text = pending.result()
+        if i + 1 < len(paths):
+            pending = _reader.submit(_map_or_error, paths[i + 1])
+        results.append(check_file(_grammar, path, text))
+    return results
+
+
+def iter_paths(sources, pattern='*'):
+    for source in sources:
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    if fnmatch.fnmatch(name, pattern):
+                        yield os.path.join(root, name)
+        else:
+            yield source
+
+
+def read_file_list(path):
+    f = sys.stdin if path == '-' else open(path)
+    try:
+        return [line.rstrip('\n') for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def check_files(name, paths, jobs=None, cache_dir=None):
+    # Yields one result record per path, in input order.  With cache_dir, the
+    # results of files seen before are read from an on-disk ParseCache
+    grammar = get_grammar(name)
+    grammar.parser  # build or load the tables once, before any worker starts
+
+    if jobs == 1:
+        saved = grammar.cache
+        if cache_dir:
+            grammar.cache = ParseCache(directory=cache_dir)
+        try:
+            for path in paths:
+                yield check_file(grammar, path, _map_or_error(path))
+        finally:
+            grammar.cache = saved
+        return
+
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(name, cache_dir)) as pool:
+        for results in pool.map(_check_chunk, chunks):
+            yield from results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m miniparsers.batch',
+                                 description='Validate many source files in parallel.')
+    ap.add_argument('sources', nargs='*', help='files or directories to validate')
+    ap.add_argument('-g', '--grammar', default='function', choices=grammar_names())
+    ap.add_argument('--files-from', metavar='PATH', help="read file names from PATH ('-' for stdin)")
+    ap.add_argument('--pattern', default='*', help='file name pattern used inside directories')
+    ap.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='number of worker processes')
+    ap.add_argument('--format', choices=['jsonl', 'json'], default='jsonl')
+    ap.add_argument('--cache-dir', metavar='PATH', help='reuse results of unchanged files from PATH')
+    ap.add_argument('-o', '--output', metavar='PATH', help='write results to PATH instead of stdout')
+    args = ap.parse_args(argv)
+
+    paths = list(iter_paths(args.sources, args.pattern))
+    if args.files_from:
+        paths.extend(read_file_list(args.files_from))
+    if not paths:
+        ap.error('no input files')
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    start = time.perf_counter()
+    summary = {'grammar': args.grammar, 'files': 0, 'valid': 0, 'invalid': 0}
+    records = []
+    try:
+        for record in check_files(args.grammar, paths, args.jobs, args.cache_dir):
+            summary['files'] += 1
+            summary['valid' if record['valid'] else 'invalid'] += 1
+            if args.format == 'jsonl':
+                out.write(json.dumps(record) + '\n')
+            else:
+                records.append(record)
+        summary['seconds'] = round(time.perf_counter() - start, 3)
+        if args.format == 'jsonl':
+            out.write(json.dumps({'summary': summary}) + '\n')
+        else:
+            json.dump({'summary': summary, 'files': records}, out, indent=2)
+            out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if summary['invalid'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
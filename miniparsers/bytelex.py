@@ -0,0 +1,159 @@
+import contextlib
+import mmap
+import re
+
+from . import lexer as rules
+
+# Byte-level lexer for mmap'ed source files.
+#
+# ByteLexer matches the rules of miniparsers.lexer directly against a bytes-like
+# buffer (bytes, bytearray or mmap), so validating a file needs neither a read()
+# copy nor a decode.  Reserved words get their own alternatives in the master
+# pattern, which means an identifier is never sliced out of the buffer just to
+# look it up in the reserved map: token values are only sliced (and NUMBER
+# converted to int) when a grammar action reads them.
+#
+# lexpos is a byte offset into the buffer.  Tokens refer back to the buffer, so
+# read their values before an mmap is closed.
+
+IGNORE = frozenset(rules.t_ignore.encode('ascii'))
+
+
+class ByteToken:
+    __slots__ = ('type', 'lineno', 'lexpos', 'end', 'lexer', '_value')
+
+    def __init__(self, type, lineno, lexpos, end, lexer):
+        self.type = type
+        self.lineno = lineno
+        self.lexpos = lexpos
+        self.end = end
+        self.lexer = lexer
+        self._value = None
+
+    @property
+    def value(self):
+        value = self._value
+        if value is None:
+            raw = self.lexer.lexdata[self.lexpos:self.end]
+            value = self._value = int(raw) if self.type == 'NUMBER' else raw.decode('ascii')
+        return value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    def __repr__(self):
+        return f'LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})'
+
+
+def master_pattern(reserved):
+    # Same order as ply.lex: function rules as defined, then string rules by
+    # decreasing regex length.  Keywords come first and must end at a
+    # non-identifier character, which is what the reserved-map lookup in
+    # t_IDENTIFIER amounts to.
+    kinds = [None]
+    parts = []
+    for kind in dict.fromkeys(reserved.values()):
+        words = sorted((w for w, k in reserved.items() if k == kind), key=len, reverse=True)
+        parts.append('(%s)(?![a-zA-Z0-9_])' % '|'.join(re.escape(w) for w in words))
+        kinds.append(kind)
+    for func in (rules.t_IDENTIFIER, rules.t_NUMBER, rules.t_COMMENT, rules.t_newline):
+        parts.append('(%s)' % func.regex)
+        kinds.append(func.__name__[2:])
+    strings = [(name[2:], value) for name, value in vars(rules).items()
+               if name.startswith('t_') and isinstance(value, str) and name != 't_ignore']
+    for kind, regex in sorted(strings, key=lambda s: len(s[1]), reverse=True):
+        parts.append('(%s)' % regex)
+        kinds.append(kind)
+    # Leading blanks (t_ignore) are consumed by the same match
+    ignore = re.escape(rules.t_ignore)
+    return re.compile(('[%s]*(?:%s)' % (ignore, '|'.join(parts))).encode('ascii')), kinds
+
+
+_patterns = {}
+
+
+def get_pattern(reserved):
+    key = tuple(sorted(reserved.items()))
+    if key not in _patterns:
+        _patterns[key] = master_pattern(reserved)
+    return _patterns[key]
+
+
+class ByteLexer:
+    def __init__(self, reserved=None):
+        self.reserved = rules.reserved if reserved is None else reserved
+        pattern, self.kinds = get_pattern(self.reserved)
+        self.match = pattern.match
+        self.lexerrorf = rules.t_error
+        self.lineno = 1
+        self.input(b'')
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+
+    def skip(self, n):
+        self.lexpos += n
+
+    def token(self):
+        data = self.lexdata
+        pos = self.lexpos
+        end = self.lexlen
+        match = self.match
+        kinds = self.kinds
+        while pos < end:
+            m = match(data, pos)
+            if m is None:
+                while pos < end and data[pos] in IGNORE:
+                    pos += 1
+                if pos < end:
+                    pos = self.error(pos)
+                continue
+            index = m.lastindex
+            kind = kinds[index]
+            stop = m.end()
+            if kind == 'newline':
+                self.lineno += stop - m.start(index)
+            elif kind != 'COMMENT':
+                self.lexpos = stop
+                return ByteToken(kind, self.lineno, m.start(index), stop, self)
+            pos = stop
+        self.lexpos = pos
+        return None
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    def error(self, pos):
+        # t_error only looks at the first character; hand it the rest of the line
+        data = self.lexdata
+        eol = data.find(b'\n', pos)
+        tok = ByteToken('error', self.lineno, pos, self.lexlen if eol < 0 else eol, self)
+        tok.value = data[pos:tok.end].decode('utf-8', errors='replace')
+        self.lexpos = pos
+        self.lexerrorf(tok)
+        if self.lexpos == pos:
+            from ply.lex import LexError
+            raise LexError(f'Scanning error. Illegal character {tok.value[0]!r}', tok.value)
+        return self.lexpos
+
+
+def map_file(path):
+    # A read-only mmap of the file, or b'' for an empty file (which cannot be mapped)
+    with open(path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b''
+
+
+@contextlib.contextmanager
+def mapped(path):
+    data = map_file(path)
+    try:
+        yield data
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
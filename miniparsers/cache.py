@@ -0,0 +1,127 @@
+import collections
+import hashlib
+import os
+import pickle
+
+# Content-addressed cache of parse results.
+#
+#   grammar.cache = ParseCache(maxsize=4096, directory='.parsecache')
+#
+# With a cache attached, Grammar.parse(), validate() and check() first look
+# the input up by (grammar signature, operation, BLAKE2b digest of the input),
+# so repeating a parse costs one hash computation and a dict lookup.  The
+# in-memory tier is an LRU bounded to maxsize entries.  With a directory,
+# results are also pickled to <directory>/<signature>/<digest>.<op>; a memory
+# miss that finds the file loads it and a fresh result is written there, so
+# later processes start warm.  The counters record hits, misses and evictions
+# of both tiers.
+#
+# Cached trees are shared between callers: treat them as read-only.
+
+
+def grammar_signature(grammar):
+    # From the compiled tables when they are current (see miniparsers.aot),
+    # since the grammar cannot be reflected under python -OO
+    from .tables import compiled_tables
+    tables = compiled_tables(grammar.module, grammar.name)
+    if tables is not None:
+        return tables._signature
+    return reflected_signature(grammar)
+
+
+def reflected_signature(grammar):
+    # PLY's grammar signature covers the rules and precedence but not the
+    # action bodies, so the grammar, lexer and node sources are hashed in too
+    from .tables import SOURCES, reflect
+    h = hashlib.sha1(reflect(grammar.module).signature().encode('utf-8'))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for path in [grammar.module.__file__] + [os.path.join(here, name) for name in SOURCES]:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def digest(data):
+    # data: str or a bytes-like buffer (bytes, bytearray, mmap)
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ParseCache:
+    def __init__(self, maxsize=1024, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.entries = collections.OrderedDict()
+        self.counters = dict.fromkeys(
+            ['hits', 'misses', 'evictions', 'disk_hits', 'disk_misses', 'disk_writes'], 0)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    def lookup(self, grammar, op, data, compute):
+        # compute(data) produces the result on a miss
+        key = (grammar.signature, op, digest(data))
+        entries = self.entries
+        try:
+            result = entries[key]
+        except KeyError:
+            pass
+        else:
+            entries.move_to_end(key)
+            self.counters['hits'] += 1
+            return result
+
+        self.counters['misses'] += 1
+        path = self._path(key) if self.directory else None
+        if path is not None:
+            result = self._load(path)
+            if result is not None:
+                self.counters['disk_hits'] += 1
+                self._remember(key, result[0])
+                return result[0]
+            self.counters['disk_misses'] += 1
+
+        result = compute(data)
+        self._remember(key, result)
+        if path is not None:
+            self._store(path, result)
+        return result
+
+    def _remember(self, key, result):
+        entries = self.entries
+        entries[key] = result
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def _path(self, key):
+        signature, op, name = key
+        return os.path.join(self.directory, signature, f'{name}.{op}')
+
+    def _load(self, path):
+        # A one-element tuple, so that a cached None is told apart from a miss
+        try:
+            with open(path, 'rb') as f:
+                return (pickle.load(f),)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def _store(self, path, result):
+        # Same write-then-rename as the table cache in miniparsers.tables
+        tmp = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, 'wb') as f:
+                pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            self.counters['disk_writes'] += 1
+        except (OSError, RecursionError, pickle.PicklingError):
+            # The memory tier still has it; very deep trees are not written
+            pass
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
@@ -0,0 +1,270 @@
+import argparse
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+from .cache import ParseCache
+from .registry import get_grammar, grammar_names
+
+# Parse daemon.
+#
+#   python -m miniparsers.daemon serve [--socket PATH]
+#   python -m miniparsers.daemon check -g while a.c b.c [--socket PATH]
+#
+# The server builds the parser of every dialect once at startup and then
+# answers requests on a Unix socket, so a client pays for neither interpreter
+# start nor table loading.  Every message in both directions is a frame: a
+# 4-byte big-endian length followed by that many bytes of UTF-8 JSON.  A
+# request carries a batch of sources and gets one response with a result per
+# source, in order:
+#
+#   {"requests": [{"grammar": "while", "source": "x = 1;", "op": "check"}, ...]}
+#   {"results": [{"valid": true, "errors": []}, ...]}
+#
+# op is "check" (the default: validity plus every diagnostic) or "validate"
+# (validity only).  A connection may send any number of requests.  A request
+# that cannot be decoded gets {"error": message}; a bad item gets a result
+# with an "error" key.  Results are cached by content (see miniparsers.cache),
+# so resending an unchanged source costs a hash and a lookup.
+#
+# The default socket lives in a directory only its user can enter:
+# $XDG_RUNTIME_DIR, or miniparsers-<uid> in the temp directory, created with
+# mode 0700.  A server refuses to start over a path that is not a socket or
+# whose daemon still accepts connections; only a stale socket is replaced.
+
+MAX_FRAME = 1 << 28
+HEADER = struct.Struct('>I')
+
+
+def default_dir():
+    return os.environ.get('XDG_RUNTIME_DIR') or os.path.join(
+        tempfile.gettempdir(), f'miniparsers-{os.getuid()}')
+
+
+def default_socket():
+    return os.environ.get('AFLL_DAEMON_SOCKET') or os.path.join(default_dir(), 'miniparsers.sock')
+
+
+def private_dir(directory):
+    # Create directory for this user only, and refuse one that another user
+    # owns or can enter
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f'{directory} is not a directory private to this user')
+
+
+def remove_stale(path):
+    # Unlink a socket left over from a server that did not shut down cleanly;
+    # anything else at path is an error
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(st.st_mode):
+        raise RuntimeError(f'{path} exists and is not a socket')
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f'A daemon is already running on {path}')
+
+
+def send_frame(sock, obj):
+    data = json.dumps(obj).encode('utf-8')
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(min(n - len(buf), 1 << 20))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_frame(sock):
+    # The decoded JSON object, or None when the peer closed the connection
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError(f'Frame of {size} bytes exceeds the limit of {MAX_FRAME}')
+    data = _recv_exact(sock, size)
+    if data is None:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+def run_item(item):
+    if not isinstance(item, dict) or not isinstance(item.get('grammar'), str) \
+            or not isinstance(item.get('source'), str):
+        return {'error': "Each request needs a string 'grammar' and a string 'source'"}
+    try:
+        grammar = get_grammar(item['grammar'])
+    except KeyError as e:
+        return {'error': e.args[0]}
+    source = item['source']
+    op = item.get('op', 'check')
+    if op == 'validate':
+        return {'valid': grammar.validate(source)}
+    if op != 'check':
+        return {'error': f'Unknown op {op!r}'}
+    if grammar.validate(source):
+        return {'valid': True, 'errors': []}
+    errors = [d.as_dict() for d in grammar.check(source)[1]]
+    return {'valid': not errors, 'errors': errors}
+
+
+class Server:
+    def __init__(self, path, cache=None):
+        import threading  # server side only: the client stays cheap to start
+        self.lock = threading.Lock()
+        for name in grammar_names():
+            grammar = get_grammar(name)
+            grammar.parser
+            grammar.recognizer
+            grammar.cache = cache
+        if os.path.dirname(os.path.abspath(path)) == default_dir():
+            private_dir(default_dir())
+        remove_stale(path)
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen()
+
+    def serve_forever(self):
+        import threading
+        while True:
+            conn, _ = self.sock.accept()
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = recv_frame(conn)
+                except (OSError, ValueError) as e:
+                    try:
+                        send_frame(conn, {'error': str(e)})
+                    except OSError:
+                        pass
+                    return
+                if request is None:
+                    return
+                items = request.get('requests') if isinstance(request, dict) else None
+                if not isinstance(items, list):
+                    send_frame(conn, {'error': "Expected an object with a 'requests' list"})
+                    continue
+                # The parsers and the shared lexer are not reentrant
+                with self.lock:
+                    results = [self.run(item) for item in items]
+                send_frame(conn, {'results': results})
+
+    @staticmethod
+    def run(item):
+        # A failing item gets an error result rather than costing the client
+        # its connection
+        try:
+            return run_item(item)
+        except Exception as e:
+            return {'error': f'{type(e).__name__}: {e}'}
+
+    def close(self):
+        self.sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Client:
+    def __init__(self, path=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path or default_socket())
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, items):
+        send_frame(self.sock, {'requests': items})
+        response = recv_frame(self.sock)
+        if response is None:
+            raise ConnectionError('The daemon closed the connection')
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['results']
+
+    def check(self, grammar, sources, op='check'):
+        return self.request([{'grammar': grammar, 'source': s, 'op': op} for s in sources])
+
+
+def serve(path, cache=None):
+    with Server(path, cache) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m miniparsers.daemon',
+                                 description='Keep warm parsers for every dialect behind a Unix socket.')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--socket', default=default_socket(), help='socket path (default: %(default)s)')
+    sub = ap.add_subparsers(dest='command', required=True)
+    server = sub.add_parser('serve', parents=[common], help='run the daemon in the foreground')
+    server.add_argument('--cache-size', type=int, default=4096,
+                        help='results kept in memory, 0 to disable (default: %(default)s)')
+    server.add_argument('--cache-dir', metavar='PATH', help='also keep results on disk in PATH')
+    check = sub.add_parser('check', parents=[common], help='check files through a running daemon')
+    check.add_argument('paths', nargs='+')
+    check.add_argument('-g', '--grammar', default='function', choices=grammar_names())
+    args = ap.parse_args(argv)
+
+    if args.command == 'serve':
+        cache = None
+        if args.cache_size > 0:
+            cache = ParseCache(args.cache_size, args.cache_dir)
+        try:
+            serve(args.socket, cache)
+        except RuntimeError as e:
+            sys.exit(f'{ap.prog}: {e}')
+        return 0
+
+    sources = []
+    for path in args.paths:
+        with open(path) as f:
+            sources.append(f.read())
+    with Client(args.socket) as client:
+        results = client.check(args.grammar, sources)
+    for path, result in zip(args.paths, results):
+        print(json.dumps(dict(path=path, **result)))
+    return 0 if all(r.get('valid') for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import contextlib
+import contextvars
+import json
+import sys
+
+from .lines import LineIndex
+
+# Structured diagnostics.
+#
+# check() parses a text once and returns the tree together with every lexical
+# and syntax error found on the way.  The grammars recover from a syntax error
+# at statement level (skipping to the next ';') or, failing that, at block
+# level (skipping to the closing '}'), so one pass reports the errors of every
+# broken statement instead of stopping at the first.  Error-free parses never
+# enter the recovery productions and run exactly as before.
+#
+# Outside check(), t_error and every p_error hand their Diagnostic to the
+# current sink.  The default sink drops them, so library parses never write to
+# stdout; the afll*.py scripts install a PrintSink.
+#
+#   with diagnostics.using(ListSink()) as sink:
+#       grammar.parse(text)
+#   sink.diagnostics
+#
+# A sink is any object with an emit(diagnostic) method.  The current sink is
+# held in a context variable, so it belongs to the thread (or asyncio task)
+# that installed it: check() in one thread never sees the diagnostics of a
+# parse in another.  A thread starts with the default sink, whatever the main
+# thread installed.
+#
+# Diagnostics from check() also carry the column of their offset, looked up
+# in a miniparsers.lines.LineIndex of the text that is built only when there
+# are errors.  Those handed to a sink during a plain parse have only the line.
+
+
+class Diagnostic:
+    __slots__ = ('kind', 'message', 'line', 'pos', 'column')
+
+    def __init__(self, kind, message, line, pos, column=None):
+        self.kind = kind        # 'lex' or 'syntax'; 'io' for a file batch cannot read
+        self.message = message
+        self.line = line
+        self.pos = pos          # source offset, None at end of input
+        self.column = column    # from 1; set by check(), None at end of input
+
+    def __repr__(self):
+        return (f'Diagnostic({self.kind!r}, {self.message!r}, line={self.line}, column={self.column}, '
+                f'pos={self.pos})')
+
+    def __eq__(self, other):
+        return (type(self) is type(other) and self.kind == other.kind and self.message == other.message
+                and self.line == other.line and self.pos == other.pos and self.column == other.column)
+
+    __hash__ = None
+
+    def as_dict(self):
+        return {'kind': self.kind, 'line': self.line, 'column': self.column, 'pos': self.pos,
+                'message': self.message}
+
+
+class NullSink:
+    def emit(self, diagnostic):
+        pass
+
+
+class ListSink:
+    def __init__(self):
+        self.diagnostics = []
+
+    def emit(self, diagnostic):
+        self.diagnostics.append(diagnostic)
+
+
+class JsonLinesSink:
+    def __init__(self, f):
+        self.f = f
+
+    def emit(self, diagnostic):
+        self.f.write(json.dumps(diagnostic.as_dict()) + '\n')
+
+
+class PrintSink:
+    def __init__(self, f=None):
+        self.f = f
+
+    def emit(self, diagnostic):
+        f = self.f or sys.stdout
+        print(f'{where(diagnostic)}{diagnostic.message}', file=f)
+
+
+def where(diagnostic):
+    # 'line N: ' or 'line N, column C: ' prefix for a message, '' if unknown
+    if diagnostic.line is None:
+        return ''
+    if diagnostic.column is None:
+        return f'line {diagnostic.line}: '
+    return f'line {diagnostic.line}, column {diagnostic.column}: '
+
+
+_sink = contextvars.ContextVar('miniparsers.diagnostics.sink', default=NullSink())
+
+
+def get_sink():
+    return _sink.get()
+
+
+def set_sink(new):
+    # Install new as the sink of the current thread or task and return the
+    # previous one.  Only the sinks are per thread: the shared lexer and the
+    # parsers are not reentrant, so threads that parse at the same time must
+    # still take turns (miniparsers.daemon holds a lock for that).
+    old = _sink.get()
+    _sink.set(new)
+    return old
+
+
+@contextlib.contextmanager
+def using(new):
+    token = _sink.set(new)
+    try:
+        yield new
+    finally:
+        _sink.reset(token)
+
+
+def lex_error(t):
+    _sink.get().emit(Diagnostic('lex', f"Illegal character '{t.value[0]}'", t.lineno, t.lexpos))
+    t.lexer.skip(1)
+
+
+def syntax_error(p):
+    if p:
+        _sink.get().emit(Diagnostic('syntax', f"Syntax error at '{p.value}'", p.lineno, p.lexpos))
+    else:
+        _sink.get().emit(Diagnostic('syntax', 'Syntax error at EOF', None, None))
+
+
+def check(grammar, text):
+    # text may be a str or a bytes-like buffer (bytes, bytearray, mmap)
+    from .bytelex import ByteLexer  # the lexer modules report through this one
+    lexer = grammar.lexer() if isinstance(text, str) else ByteLexer(grammar.reserved)
+    lexer.input(text)
+    with using(ListSink()) as collected:
+        tree = grammar._parse(lexer)
+    index = LineIndex(text) if collected.diagnostics else None
+    for d in collected.diagnostics:
+        if d.pos is None:
+            d.line = lexer.lineno  # an error at EOF is on the last line
+        else:
+            d.column = index.column(d.pos)
+    return tree, collected.diagnostics
@@ -0,0 +1,172 @@
+import re
+
+from . import lexer as rules
+
+# Purpose-built lexer for the token set of miniparsers.lexer.
+#
+# ply.lex tries its master alternation regex at every position, builds a match
+# object for every token and then calls t_IDENTIFIER / t_NUMBER / t_COMMENT /
+# t_newline as Python functions.  FastLexer instead cuts the input into
+# lexemes with one findall() pass per line-aligned chunk (no match objects, no
+# per-token calls into Python) and classifies every lexeme with two tables:
+#
+#   KINDS   exact lexeme -> token type, for operators, punctuation and the
+#           reserved words of the current dialect
+#   FIRST   first character -> category, for identifiers, numbers, blanks,
+#           newlines and comments
+#
+# Anything left over is an illegal character and goes to t_error.  Token
+# types, values, lexpos and lineno are exactly those of the ply.lex lexer built
+# from the same rules; benchmarks/fastlex.py checks this on random input.
+
+IDENT, NUMBER, BLANK, NEWLINE, COMMENT = range(5)
+
+# Lines are handed to findall() in chunks of about this many characters
+CHUNK_SIZE = 1 << 16
+
+# Operator and punctuation lexemes -> token type
+OPERATORS = {}
+for _name, _regex in vars(rules).items():
+    if _name.startswith('t_') and isinstance(_regex, str) and _name != 't_ignore':
+        OPERATORS[re.sub(r'\\(.)', r'\1', _regex)] = _name[2:]
+
+FIRST = {}
+for _c in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_':
+    FIRST[_c] = IDENT
+for _c in '0123456789':
+    FIRST[_c] = NUMBER
+for _c in rules.t_ignore:
+    FIRST[_c] = BLANK
+FIRST['\n'] = NEWLINE
+FIRST['/'] = COMMENT
+del _name, _regex, _c
+
+# Every character of the input belongs to exactly one lexeme.  Multi-character
+# operators come before the catch-all '.', which yields single-character
+# operators and illegal characters.
+LEXEME = re.compile('|'.join(
+    ['[%s]+' % re.escape(rules.t_ignore), rules.t_IDENTIFIER.regex, rules.t_NUMBER.regex,
+     rules.t_COMMENT.regex, rules.t_newline.regex] +
+    [re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True) if len(op) > 1] +
+    ['.']))
+
+
+class FastToken:
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __repr__(self):
+        return f'LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})'
+
+
+class FastLexer:
+    def __init__(self, reserved=None):
+        self.reserved = rules.reserved if reserved is None else reserved
+        self.lexerrorf = rules.t_error
+        self.lineno = 1
+        self.input('')
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+        # token() is a C-level call into the scanning generator
+        self.token = self.scan().__next__
+
+    def clone(self):
+        lexer = FastLexer(self.reserved)
+        lexer.lexerrorf = self.lexerrorf
+        return lexer
+
+    def skip(self, n):
+        self.lexpos += n
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    def scan(self):
+        text = self.lexdata
+        kinds = dict(OPERATORS)
+        kinds.update(self.reserved)
+        Token = FastToken
+        # lexpos and lineno are brought up to date at every error and at the end
+        number = 'NUMBER'
+        for kind, pos, lexeme, lineno in lexemes(text, self.lexpos, self.lexlen, self.lineno, kinds,
+                                                 'IDENTIFIER', number, self.error):
+            if kind is None:
+                break
+            tok = Token()
+            tok.type = kind
+            tok.value = int(lexeme) if kind is number else lexeme
+            tok.lineno = lineno
+            tok.lexpos = pos
+            yield tok
+        self.lexpos = pos
+        self.lineno = lineno
+        while True:
+            yield None
+
+    def error(self, pos, lineno):
+        # t_error only looks at the first character; hand it the rest of the line
+        eol = self.lexdata.find('\n', pos)
+        tok = FastToken()
+        tok.type = 'error'
+        tok.value = self.lexdata[pos:] if eol < 0 else self.lexdata[pos:eol]
+        tok.lineno = lineno
+        tok.lexpos = pos
+        tok.lexer = self
+        self.lexpos = pos
+        self.lineno = lineno
+        self.lexerrorf(tok)
+        if self.lexpos == pos:
+            from ply.lex import LexError
+            raise LexError(f"Scanning error. Illegal character '{self.lexdata[pos]}'", self.lexdata[pos:])
+        return self.lexpos, self.lineno
+
+
+def lexemes(text, pos, end, lineno, kinds, ident, number, error):
+    # The scanner behind FastLexer and miniparsers.tokbuf: yields (code, start,
+    # lexeme, lineno) for every token of text[pos:end], then (None, pos, '',
+    # lineno) with the offset where scanning stopped (end, or past it if the
+    # error handler skipped further) and the line count there.  The lexeme
+    # rather than its length is handed over, so FastLexer does not slice the
+    # value out of the text a second time.  kinds
+    # maps operator and reserved-word lexemes to their codes; ident and
+    # number are the codes of identifiers and numbers.  error(pos, lineno)
+    # is called at an illegal character and returns where to resume.
+    kind_of = kinds.get
+    first = FIRST.get
+    findall = LEXEME.findall
+    while pos < end:
+        stop = text.find('\n', pos + CHUNK_SIZE, end)
+        stop = end if stop < 0 else stop + 1
+        for lexeme in findall(text, pos, stop):
+            n = len(lexeme)
+            code = kind_of(lexeme)
+            if code is None:
+                category = first(lexeme[0])
+                if category is IDENT:
+                    code = ident
+                elif category is BLANK:
+                    pos += n
+                    continue
+                elif category is NUMBER or (category is None and lexeme[0].isdecimal()):
+                    # \d also matches non-ASCII decimal digits, and int() accepts them
+                    code = number
+                elif category is NEWLINE:
+                    lineno += n
+                    pos += n
+                    continue
+                elif category is COMMENT and n > 1:
+                    pos += n
+                    continue
+                else:
+                    resume, lineno = error(pos, lineno)
+                    if resume != pos + n:
+                        # The handler skipped more (or less) than this lexeme
+                        pos = resume
+                        break
+                    pos = resume
+                    continue
+            yield code, pos, lexeme, lineno
+            pos += n
+    yield None, pos, '', lineno
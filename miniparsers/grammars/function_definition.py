@@ -0,0 +1,145 @@
+# Function definition dialect (afll3.py, afll4.py, afll8.py, afll9.py)
+
+from .. import diagnostics
+from ..nodes import Assign, BinOp, Compare, Error, FunctionDef, If, Name, Num, Param, Return
+
+tokens = ['IF', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 'IDENTIFIER', 'ASSIGN', 'NUMBER',
+          'EQ', 'LT', 'GT', 'LE', 'GE', 'NEQ', 'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'SEMICOLON', 'COMMA',
+          'TYPE', 'RETURN']
+
+reserved = {
+    'if': 'IF',
+    'int': 'TYPE',
+    'void': 'TYPE',
+    'float': 'TYPE',
+    'return': 'RETURN'
+}
+
+# Define precedence of operators, lowest first
+precedence = (
+    ('nonassoc', 'LT', 'GT', 'LE', 'GE', 'EQ', 'NEQ'),  # Comparison operators
+    ('left', 'PLUS', 'MINUS'),  # Addition and subtraction
+    ('left', 'TIMES', 'DIVIDE'),  # Multiplication and division
+)
+
+# Function definition rule
+def p_function_definition(p):
+    '''function_definition : TYPE IDENTIFIER LPAREN parameter_list RPAREN block'''
+    p[0] = FunctionDef(p[1], p[2], p[4], p[6], p.lexpos(1))
+
+# Parameter list rule
+def p_parameter_list(p):
+    '''parameter_list : parameter_list COMMA parameter
+                      | parameter
+                      | '''
+    # Empty production allows no parameters.  Append in place: p[1] + [p[3]]
+    # would copy the list for every parameter
+    if len(p) == 1:
+        p[0] = []
+    elif len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
+
+# Parameter rule
+def p_parameter(p):
+    '''parameter : TYPE IDENTIFIER'''
+    p[0] = Param(p[1], p[2], p.lexpos(1))
+
+# If statement rule
+def p_if(p):
+    '''if : IF LPAREN condition RPAREN block'''
+    p[0] = If(p[3], p[5], p.lexpos(1))
+
+# Condition rule for comparisons
+def p_condition(p):
+    '''condition : expression EQ expression
+                 | expression NEQ expression
+                 | expression LT expression
+                 | expression GT expression
+                 | expression LE expression
+                 | expression GE expression'''
+    p[0] = Compare(p[2], p[1], p[3], p[1].pos)
+
+# Expression rules for arithmetic and identifiers
+def p_expression_name(p):
+    '''expression : IDENTIFIER'''
+    p[0] = Name(p[1], p.lexpos(1))
+
+def p_expression_number(p):
+    '''expression : NUMBER'''
+    p[0] = Num(p[1], p.lexpos(1))
+
+def p_expression_binop(p):
+    '''expression : expression PLUS expression
+                  | expression MINUS expression
+                  | expression TIMES expression
+                  | expression DIVIDE expression'''
+    p[0] = BinOp(p[2], p[1], p[3], p[1].pos)
+
+def p_expression_group(p):
+    '''expression : LPAREN expression RPAREN'''
+    p[0] = p[2]
+
+# Assignment rule for statements inside the block
+def p_assignment(p):
+    '''assignment : IDENTIFIER ASSIGN expression SEMICOLON'''
+    p[0] = Assign(p[1], p[3], p.lexpos(1))
+
+# Return statement rule
+def p_return_statement(p):
+    '''return_statement : RETURN expression SEMICOLON'''
+    p[0] = Return(p[2], p.lexpos(1))
+
+# Block of code with statements
+def p_block(p):
+    '''block : LBRACE statement_list RBRACE'''
+    p[0] = p[2]
+
+# List of statements within a block
+def p_statement_list(p):
+    '''statement_list : statement_list statement
+                      | statement'''
+    # Append in place: p[1] + [p[2]] would copy the list for every statement
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[2])
+        p[0] = p[1]
+
+# Statements allowed in the block
+def p_statement(p):
+    '''statement : assignment
+                 | if
+                 | return_statement
+                 | function_definition'''
+    p[0] = p[1]
+
+# A broken condition or parameter list: skip to the '{' of the block
+def p_if_error(p):
+    '''if : IF error block'''
+    p[0] = If(Error(p.lexpos(2)), p[3], p.lexpos(1))
+
+def p_function_definition_error(p):
+    '''function_definition : TYPE IDENTIFIER error block'''
+    p[0] = FunctionDef(p[1], p[2], [Error(p.lexpos(3))], p[4], p.lexpos(1))
+
+# Panic-mode recovery: skip the tokens of a broken statement up to its ';'
+def p_statement_error(p):
+    '''statement : error SEMICOLON'''
+    p[0] = Error(p.lexpos(1))
+
+# ... or, failing that, up to the '}' that closes the block
+def p_block_error(p):
+    '''block : LBRACE statement_list error RBRACE
+             | LBRACE error RBRACE'''
+    if len(p) == 4:
+        p[0] = [Error(p.lexpos(2))]
+    else:
+        p[2].append(Error(p.lexpos(3)))
+        p[0] = p[2]
+
+# Handle syntax errors: report to the current diagnostics sink
+def p_error(p):
+    diagnostics.syntax_error(p)
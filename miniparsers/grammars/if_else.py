@@ -0,0 +1,116 @@
+# if/else dialect (afll.py, afll5.py)
+
+from .. import diagnostics
+from ..nodes import Assign, BinOp, Compare, Error, If, IfElse, Name, Num
+
+tokens = ['IF', 'ELSE', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 'IDENTIFIER', 'ASSIGN', 'NUMBER',
+          'EQ', 'LT', 'GT', 'LE', 'GE', 'NEQ', 'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'SEMICOLON']
+
+reserved = {
+    'if': 'IF',
+    'else': 'ELSE'
+}
+
+# Define precedence of operators, lowest first
+precedence = (
+    ('nonassoc', 'LT', 'GT', 'LE', 'GE', 'EQ', 'NEQ'),  # Comparison operators
+    ('left', 'PLUS', 'MINUS'),  # Addition and subtraction
+    ('left', 'TIMES', 'DIVIDE'),  # Multiplication and division
+)
+
+
+def p_ifelse(p):
+    '''ifelse : IF LPAREN condition RPAREN block else_part'''
+    if p[6] is None:
+        p[0] = If(p[3], p[5], p.lexpos(1))
+    else:
+        p[0] = IfElse(p[3], p[5], p[6], p.lexpos(1))
+
+def p_else_part(p):
+    '''else_part : ELSE block
+                 | empty'''
+    p[0] = p[2] if len(p) == 3 else None
+
+def p_condition(p):
+    '''condition : expression EQ expression
+                 | expression NEQ expression
+                 | expression LT expression
+                 | expression GT expression
+                 | expression LE expression
+                 | expression GE expression'''
+    p[0] = Compare(p[2], p[1], p[3], p[1].pos)
+
+def p_expression_name(p):
+    '''expression : IDENTIFIER'''
+    p[0] = Name(p[1], p.lexpos(1))
+
+def p_expression_number(p):
+    '''expression : NUMBER'''
+    p[0] = Num(p[1], p.lexpos(1))
+
+def p_expression_binop(p):
+    '''expression : expression PLUS expression
+                  | expression MINUS expression
+                  | expression TIMES expression
+                  | expression DIVIDE expression'''
+    p[0] = BinOp(p[2], p[1], p[3], p[1].pos)
+
+def p_expression_group(p):
+    '''expression : LPAREN expression RPAREN'''
+    p[0] = p[2]
+
+# Assignment rule for the block
+def p_assignment(p):
+    '''assignment : IDENTIFIER ASSIGN expression SEMICOLON'''
+    p[0] = Assign(p[1], p[3], p.lexpos(1))
+
+def p_block(p):
+    '''block : LBRACE statement_list RBRACE'''
+    p[0] = p[2]
+
+def p_statement_list(p):
+    '''statement_list : statement
+                      | statement_list statement'''
+    # Append in place: p[1] + [p[2]] would copy the list for every statement
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[2])
+        p[0] = p[1]
+
+def p_statement(p):
+    '''statement : assignment
+                 | ifelse'''
+    p[0] = p[1]
+
+# A broken condition: skip to the '{' of the block
+def p_ifelse_error(p):
+    '''ifelse : IF error block else_part'''
+    test = Error(p.lexpos(2))
+    if p[4] is None:
+        p[0] = If(test, p[3], p.lexpos(1))
+    else:
+        p[0] = IfElse(test, p[3], p[4], p.lexpos(1))
+
+# Panic-mode recovery: skip the tokens of a broken statement up to its ';'
+def p_statement_error(p):
+    '''statement : error SEMICOLON'''
+    p[0] = Error(p.lexpos(1))
+
+# ... or, failing that, up to the '}' that closes the block
+def p_block_error(p):
+    '''block : LBRACE statement_list error RBRACE
+             | LBRACE error RBRACE'''
+    if len(p) == 4:
+        p[0] = [Error(p.lexpos(2))]
+    else:
+        p[2].append(Error(p.lexpos(3)))
+        p[0] = p[2]
+
+def p_empty(p):
+    'empty :'
+    pass
+
+# Handle syntax errors: report to the current diagnostics sink
+def p_error(p):
+    diagnostics.syntax_error(p)
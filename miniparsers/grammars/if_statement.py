@@ -0,0 +1,96 @@
+# if dialect (afll1.py, afll6.py)
+
+from .. import diagnostics
+from ..nodes import Assign, BinOp, Compare, Error, If, Name, Num
+
+tokens = ['IF', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 'IDENTIFIER', 'ASSIGN', 'NUMBER',
+          'EQ', 'LT', 'GT', 'LE', 'GE', 'NEQ', 'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'SEMICOLON']
+
+reserved = {
+    'if': 'IF'
+}
+
+# Define precedence of operators, lowest first
+precedence = (
+    ('nonassoc', 'LT', 'GT', 'LE', 'GE', 'EQ', 'NEQ'),  # Comparison operators
+    ('left', 'PLUS', 'MINUS'),  # Addition and subtraction
+    ('left', 'TIMES', 'DIVIDE'),  # Multiplication and division
+)
+
+def p_if(p):
+    '''if : IF LPAREN condition RPAREN block'''
+    p[0] = If(p[3], p[5], p.lexpos(1))
+
+def p_condition(p):
+    '''condition : expression EQ expression
+                 | expression NEQ expression
+                 | expression LT expression
+                 | expression GT expression
+                 | expression LE expression
+                 | expression GE expression'''
+    p[0] = Compare(p[2], p[1], p[3], p[1].pos)
+
+def p_expression_name(p):
+    '''expression : IDENTIFIER'''
+    p[0] = Name(p[1], p.lexpos(1))
+
+def p_expression_number(p):
+    '''expression : NUMBER'''
+    p[0] = Num(p[1], p.lexpos(1))
+
+def p_expression_binop(p):
+    '''expression : expression PLUS expression
+                  | expression MINUS expression
+                  | expression TIMES expression
+                  | expression DIVIDE expression'''
+    p[0] = BinOp(p[2], p[1], p[3], p[1].pos)
+
+def p_expression_group(p):
+    '''expression : LPAREN expression RPAREN'''
+    p[0] = p[2]
+
+# Assignment rule for the block
+def p_assignment(p):
+    '''assignment : IDENTIFIER ASSIGN expression SEMICOLON'''
+    p[0] = Assign(p[1], p[3], p.lexpos(1))
+
+def p_block(p):
+    '''block : LBRACE statement_list RBRACE'''
+    p[0] = p[2]
+
+def p_statement_list(p):
+    '''statement_list : statement_list statement
+                      | '''  # This allows an empty block (no statements)
+    # A separate `statement_list : statement` alternative would make a single
+    # statement ambiguous.  Append in place: p[1] + [p[2]] would copy the list
+    # for every statement
+    if len(p) == 1:
+        p[0] = []
+    else:
+        p[1].append(p[2])
+        p[0] = p[1]
+
+def p_statement(p):
+    '''statement : assignment
+                 | if'''
+    p[0] = p[1]
+
+# A broken condition: skip to the '{' of the block
+def p_if_error(p):
+    '''if : IF error block'''
+    p[0] = If(Error(p.lexpos(2)), p[3], p.lexpos(1))
+
+# Panic-mode recovery: skip the tokens of a broken statement up to its ';'
+def p_statement_error(p):
+    '''statement : error SEMICOLON'''
+    p[0] = Error(p.lexpos(1))
+
+# ... or, failing that, up to the '}' that closes the block
+def p_block_error(p):
+    '''block : LBRACE statement_list error RBRACE'''
+    p[2].append(Error(p.lexpos(3)))
+    p[0] = p[2]
+
+# Handle syntax errors: report to the current diagnostics sink
+def p_error(p):
+    diagnostics.syntax_error(p)
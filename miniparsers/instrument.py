@@ -0,0 +1,164 @@
+import argparse
+import contextlib
+import json
+import sys
+from time import perf_counter
+
+from .registry import get_grammar, grammar_names
+
+# Opt-in parse instrumentation.
+#
+#   stats = ParseStats()
+#   with stats.attach(get_grammar('while')) as grammar:
+#       grammar.parse(text)
+#   print(stats.report())
+#
+#   python -m miniparsers.instrument -g while program.txt [--json]
+#
+# While attached, every production's action is wrapped to count its
+# reductions and time it, the lexer's token() calls are timed, and every token
+# handed to the parser is counted as a shift (tokens discarded during syntax
+# error recovery are counted under syntax_errors instead of being told apart).
+# Time spent in the LR loop itself is what is left of the total.  A detached
+# grammar runs the plain actions and lexer; the only cost is one attribute
+# test per parse call.
+
+
+class _TimedLexer:
+    def __init__(self, stats, lexer):
+        self.lexer = lexer
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.lexer, name)
+
+    def token(self):
+        start = perf_counter()
+        tok = self.lexer.token()
+        self.stats.lex_time += perf_counter() - start
+        if tok is not None:
+            self.stats.shifts += 1
+        return tok
+
+
+class ParseStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.reductions = {}    # production -> count
+        self.action_time = {}   # production -> seconds spent in its action
+        self.shifts = 0
+        self.syntax_errors = 0
+        self.lex_time = 0.0
+        self.total_time = 0.0
+        self.parses = 0
+
+    @contextlib.contextmanager
+    def attach(self, grammar):
+        if grammar.stats is not None:
+            raise ValueError(f'Grammar {grammar.name!r} is already instrumented')
+        parser = grammar.parser
+        saved = [p.callable for p in parser.productions]
+        saved_errorfunc = parser.errorfunc
+        for p in parser.productions:
+            if p.callable is not None:
+                p.callable = self._wrap(p.str, p.callable)
+        if saved_errorfunc is not None:
+            parser.errorfunc = self._wrap_error(saved_errorfunc)
+        grammar.stats = self
+        try:
+            yield grammar
+        finally:
+            grammar.stats = None
+            parser.errorfunc = saved_errorfunc
+            for p, func in zip(parser.productions, saved):
+                p.callable = func
+
+    def _wrap(self, production, func):
+        self.reductions.setdefault(production, 0)
+        self.action_time.setdefault(production, 0.0)
+        reductions = self.reductions
+        action_time = self.action_time
+
+        def action(p):
+            start = perf_counter()
+            func(p)
+            action_time[production] += perf_counter() - start
+            reductions[production] += 1
+
+        action.__name__ = func.__name__
+        return action
+
+    def _wrap_error(self, func):
+        def errorfunc(p):
+            self.syntax_errors += 1
+            return func(p)
+        return errorfunc
+
+    def parse(self, parser, lexer):
+        # Called by Grammar for every parse while attached
+        start = perf_counter()
+        try:
+            return parser.parse(lexer=_TimedLexer(self, lexer))
+        finally:
+            self.total_time += perf_counter() - start
+            self.parses += 1
+
+    def as_dict(self):
+        actions = sum(self.action_time.values())
+        return {
+            'parses': self.parses,
+            'total_time': self.total_time,
+            'lex_time': self.lex_time,
+            'action_time': actions,
+            'lr_time': self.total_time - self.lex_time - actions,
+            'shifts': self.shifts,
+            'reductions': sum(self.reductions.values()),
+            'syntax_errors': self.syntax_errors,
+            'productions': [
+                {'production': name, 'reductions': self.reductions[name], 'time': self.action_time[name]}
+                for name in sorted(self.reductions, key=lambda n: -self.action_time[n])
+                if self.reductions[name]
+            ],
+        }
+
+    def report(self):
+        d = self.as_dict()
+        total = d['total_time'] or 1.0
+        lines = [f"{d['parses']} parse(s) in {d['total_time'] * 1e3:.1f} ms: "
+                 f"lexer {d['lex_time'] * 1e3:.1f} ms ({d['lex_time'] / total:.0%}), "
+                 f"actions {d['action_time'] * 1e3:.1f} ms ({d['action_time'] / total:.0%}), "
+                 f"LR loop {d['lr_time'] * 1e3:.1f} ms ({d['lr_time'] / total:.0%})",
+                 f"{d['shifts']} shifts, {d['reductions']} reductions, {d['syntax_errors']} syntax errors",
+                 '',
+                 f"{'reductions':>10} {'ms':>9} {'share':>6}  production"]
+        for row in d['productions']:
+            lines.append(f"{row['reductions']:10d} {row['time'] * 1e3:9.2f} {row['time'] / total:6.1%}  "
+                         f"{row['production']}")
+        return '\n'.join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m miniparsers.instrument',
+                                 description='Parse files and report where the parse time goes.')
+    ap.add_argument('paths', nargs='+', help='files to parse')
+    ap.add_argument('-g', '--grammar', default='function', choices=grammar_names(),
+                    help='dialect to parse (default: function)')
+    ap.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = ap.parse_args(argv)
+
+    stats = ParseStats()
+    with stats.attach(get_grammar(args.grammar)) as grammar:
+        for path in args.paths:
+            with open(path) as f:
+                grammar.parse(f.read())
+    if args.json:
+        json.dump(stats.as_dict(), sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        print(stats.report())
+
+
+if __name__ == '__main__':
+    main()
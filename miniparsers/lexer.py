@@ -0,0 +1,109 @@
+import sys
+
+from . import diagnostics
+
+# Shared lexer for every dialect.
+#
+# The token list and the reserved map are the union of what the afll*.py
+# scripts define.  A dialect narrows the keywords it recognises by setting
+# lexer.reserved to its own map before parsing, so e.g. 'while' is still an
+# IDENTIFIER for the if/else dialect.
+
+tokens = ['IF', 'ELSE', 'WHILE', 'LPAREN', 'RPAREN', 'LBRACE', 'RBRACE', 'IDENTIFIER', 'ASSIGN',
+          'NUMBER', 'EQ', 'LT', 'GT', 'LE', 'GE', 'NEQ', 'PLUS', 'MINUS', 'TIMES', 'DIVIDE',
+          'SEMICOLON', 'COMMA', 'TYPE', 'RETURN']
+
+# Define token patterns
+t_LPAREN = r'\('
+t_RPAREN = r'\)'
+t_LBRACE = r'\{'
+t_RBRACE = r'\}'
+t_ASSIGN = r'='  # Assignment operator
+t_PLUS = r'\+'
+t_MINUS = r'-'
+t_TIMES = r'\*'
+t_DIVIDE = r'/'  # '//' starts a comment: function rules are tried first
+t_SEMICOLON = r';'
+t_COMMA = r','
+
+# Comparison operators
+t_EQ = r'=='
+t_NEQ = r'!='
+t_LT = r'<'
+t_GT = r'>'
+t_LE = r'<='
+t_GE = r'>='
+
+# Reserved keywords of all dialects
+reserved = {
+    'if': 'IF',
+    'else': 'ELSE',
+    'while': 'WHILE',
+    'int': 'TYPE',
+    'void': 'TYPE',
+    'float': 'TYPE',
+    'return': 'RETURN'
+}
+
+def TOKEN(regex):
+    # What ply.lex.TOKEN does: the regex of a function rule is kept as an
+    # attribute rather than as its docstring, which python -OO strips
+    def decorate(func):
+        func.regex = regex
+        return func
+    return decorate
+
+# Identifier rule
+@TOKEN(r'[a-zA-Z_][a-zA-Z0-9_]*')
+def t_IDENTIFIER(t):
+    t.type = t.lexer.reserved.get(t.value, 'IDENTIFIER')  # Check for reserved keywords
+    return t
+
+# Number rule
+@TOKEN(r'\d+')
+def t_NUMBER(t):
+    t.value = int(t.value)  # Convert to an integer
+    return t
+
+# Ignore single-line comments (e.g., // comment)
+@TOKEN(r'//.*')
+def t_COMMENT(t):
+    pass  # Ignore comments
+
+# Track newlines
+@TOKEN(r'\n+')
+def t_newline(t):
+    t.lexer.lineno += len(t.value)
+
+# Ignore spaces and tabs
+t_ignore = ' \t'
+
+# Error handling: report to the current diagnostics sink and skip the character
+def t_error(t):
+    diagnostics.lex_error(t)
+
+
+_lexer = None
+
+
+def get_lexer():
+    # Built on first use and then shared by every dialect.  The rules above are
+    # run by the table-driven FastLexer; ply_lexer() builds the ply.lex
+    # equivalent
+    global _lexer
+    if _lexer is None:
+        from .fastlex import FastLexer
+        _lexer = FastLexer(reserved)
+    return _lexer
+
+
+def ply_lexer():
+    import ply.lex as lex  # deferred so importing the package stays cheap
+    from .tables import compiled_lextab
+    lextab = compiled_lextab()  # written by python -m miniparsers.aot
+    if lextab is not None:
+        lexer = lex.lex(module=sys.modules[__name__], optimize=True, lextab=lextab)
+    else:
+        lexer = lex.lex(module=sys.modules[__name__])
+    lexer.reserved = reserved
+    return lexer
@@ -0,0 +1,47 @@
+import re
+from array import array
+from bisect import bisect_right
+
+# Line and column of a source offset.
+#
+#   index = LineIndex(text)            # text: str or a bytes-like buffer
+#   index.location(tok.lexpos)         # -> (line, column), both counted from 1
+#   index.location(node.pos)
+#   index.offset(line, column)         # and back
+#
+# The offsets at which lines start are found in one regex pass and kept in an
+# array('Q'), 8 bytes per line, and a lookup bisects it, so a column costs
+# O(log lines) rather than a scan back to the previous newline.  Lines are
+# counted as the lexer counts them, at '\n'.  Columns count characters of a
+# str and bytes of a bytes-like buffer; a tab is one column.
+
+_NEWLINE = re.compile('\n')
+_NEWLINE_BYTES = re.compile(b'\n')
+
+
+class LineIndex:
+    __slots__ = ('starts',)
+
+    def __init__(self, text):
+        newline = _NEWLINE if isinstance(text, str) else _NEWLINE_BYTES
+        self.starts = array('Q', [0])  # offset of the first character of every line
+        self.starts.extend(map(re.Match.end, newline.finditer(text)))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def line(self, pos):
+        return bisect_right(self.starts, pos)
+
+    def column(self, pos):
+        return pos - self.starts[bisect_right(self.starts, pos) - 1] + 1
+
+    def location(self, pos):
+        line = bisect_right(self.starts, pos)
+        return line, pos - self.starts[line - 1] + 1
+
+    def offset(self, line, column):
+        return self.starts[line - 1] + column - 1
+
+    def nbytes(self):
+        return self.starts.itemsize * len(self.starts)
@@ -0,0 +1,180 @@
+# AST nodes built by the grammar actions.
+#
+# Every node has __slots__ and a pos attribute holding the source offset
+# (lexpos) of its first token.  Blocks and parameter lists are plain Python
+# lists.  _fields lists the child attributes in source order and _children
+# those of them that hold nodes or lists of nodes.
+
+
+class Node:
+    __slots__ = ('pos',)
+    _fields = ()
+    _children = ()
+
+    def __repr__(self):
+        from .walk import dump  # iterative, so deep trees do not hit the recursion limit
+        return dump(self)
+
+    def __eq__(self, other):
+        # Compared with an explicit stack, like everything in miniparsers.walk
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if a is b:
+                continue
+            if isinstance(a, Node):
+                if type(a) is not type(b) or a.pos != b.pos:
+                    return False
+                stack.extend((getattr(a, name), getattr(b, name)) for name in a._fields)
+            elif isinstance(a, list):
+                if type(b) is not list or len(a) != len(b):
+                    return False
+                stack.extend(zip(a, b))
+            elif a != b:
+                return False
+        return True
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Pickled as a constructor call (every __init__ takes the _fields and
+        # then pos), several times faster than the default slot state
+        return type(self), tuple([getattr(self, name) for name in self._fields] + [self.pos])
+
+
+class Program(Node):
+    __slots__ = ('body',)
+    _fields = ('body',)
+    _children = ('body',)
+
+    def __init__(self, body, pos=0):
+        self.body = body
+        self.pos = pos
+
+
+class FunctionDef(Node):
+    __slots__ = ('type', 'name', 'params', 'body')
+    _fields = ('type', 'name', 'params', 'body')
+    _children = ('params', 'body')
+
+    def __init__(self, type, name, params, body, pos):
+        self.type = type
+        self.name = name
+        self.params = params
+        self.body = body
+        self.pos = pos
+
+
+class Param(Node):
+    __slots__ = ('type', 'name')
+    _fields = ('type', 'name')
+
+    def __init__(self, type, name, pos):
+        self.type = type
+        self.name = name
+        self.pos = pos
+
+
+class If(Node):
+    __slots__ = ('test', 'body')
+    _fields = ('test', 'body')
+    _children = ('test', 'body')
+
+    def __init__(self, test, body, pos):
+        self.test = test
+        self.body = body
+        self.pos = pos
+
+
+class IfElse(Node):
+    __slots__ = ('test', 'body', 'orelse')
+    _fields = ('test', 'body', 'orelse')
+    _children = ('test', 'body', 'orelse')
+
+    def __init__(self, test, body, orelse, pos):
+        self.test = test
+        self.body = body
+        self.orelse = orelse
+        self.pos = pos
+
+
+class While(Node):
+    __slots__ = ('test', 'body')
+    _fields = ('test', 'body')
+    _children = ('test', 'body')
+
+    def __init__(self, test, body, pos):
+        self.test = test
+        self.body = body
+        self.pos = pos
+
+
+class Error(Node):
+    # Stands in for statements skipped by syntax error recovery
+    __slots__ = ()
+
+    def __init__(self, pos):
+        self.pos = pos
+
+
+class Assign(Node):
+    __slots__ = ('target', 'value')
+    _fields = ('target', 'value')
+    _children = ('value',)
+
+    def __init__(self, target, value, pos):
+        self.target = target
+        self.value = value
+        self.pos = pos
+
+
+class Return(Node):
+    __slots__ = ('value',)
+    _fields = ('value',)
+    _children = ('value',)
+
+    def __init__(self, value, pos):
+        self.value = value
+        self.pos = pos
+
+
+class Compare(Node):
+    __slots__ = ('op', 'left', 'right')
+    _fields = ('op', 'left', 'right')
+    _children = ('left', 'right')
+
+    def __init__(self, op, left, right, pos):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.pos = pos
+
+
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right')
+    _fields = ('op', 'left', 'right')
+    _children = ('left', 'right')
+
+    def __init__(self, op, left, right, pos):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.pos = pos
+
+
+class Name(Node):
+    __slots__ = ('id',)
+    _fields = ('id',)
+
+    def __init__(self, id, pos):
+        self.id = id
+        self.pos = pos
+
+
+class Num(Node):
+    __slots__ = ('value',)
+    _fields = ('value',)
+
+    def __init__(self, value, pos):
+        self.value = value
+        self.pos = pos
@@ -0,0 +1,211 @@
+import argparse
+import json
+import operator
+import sys
+
+from .diagnostics import where
+from .nodes import BinOp, Compare, If, Num, Program, Return
+from .vm import divide
+from .walk import Transformer, iter_nodes
+
+# AST optimisation pass.
+#
+#   tree, report = optimize(get_grammar('while').parse(text))
+#   print(report.summary())
+#
+#   python -m miniparsers.optimize -g while program.txt [--json]
+#
+# Constant subexpressions are folded (2 * 3 -> 6) and identities simplified
+# (x + 0, x - 0, x * 1, x / 1 -> x; x * 0 -> 0).  A condition whose operands
+# fold to constants decides its branch at compile time: a false if, else
+# branch or while is dropped and a true if is replaced by its body.  An if
+# whose block ends up empty is dropped too, an if-else with one empty branch
+# becomes an if, and statements after a return in the same block are
+# unreachable.  A while is never dropped for an empty body, since it may not
+# terminate.  Expressions have no side effects except failing on division by
+# zero, so division by a constant zero is not folded, and neither x * 0 nor
+# an empty if is removed when the expression could divide by zero.
+#
+# Trees with syntax errors may be optimised: a condition that error recovery
+# replaced by an Error node is never decided, and its statement is kept as
+# it is.  The command line reports the errors of such a file instead.
+#
+# The pass is a miniparsers.walk.Transformer, so it needs no recursion and
+# never modifies its input: changed nodes are new and unchanged subtrees are
+# shared with the input, so both trees must be treated as read-only (which
+# cached trees already are).  The report counts the folds and lists
+# every removed statement with its reason and source offset, and every empty
+# branch dropped from an if-else that stays as an if.
+
+FOLD = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': divide}
+DECIDE = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '>': operator.gt,
+          '<=': operator.le, '>=': operator.ge}
+NEGATE = {'==': '!=', '!=': '==', '<': '>=', '>=': '<', '>': '<=', '<=': '>'}
+
+DEAD_BRANCH = 'dead branch'
+CONSTANT_CONDITION = 'constant condition'
+EMPTY_BLOCK = 'empty block'
+UNREACHABLE = 'unreachable'
+
+
+class Report:
+    def __init__(self):
+        self.folded = 0       # constant subexpressions and conditions evaluated
+        self.simplified = 0   # identities removed
+        self.removed = []     # (reason, pos) of every statement taken out
+        self.blocks = []      # ('if' or 'else', pos of the if-else) of every empty branch dropped
+
+    def as_dict(self):
+        counts = {}
+        for reason, _ in self.removed:
+            counts[reason] = counts.get(reason, 0) + 1
+        return {
+            'folded': self.folded,
+            'simplified': self.simplified,
+            'removed': counts,
+            'statements': [{'reason': reason, 'pos': pos} for reason, pos in self.removed],
+            'blocks': [{'block': block, 'pos': pos} for block, pos in self.blocks],
+        }
+
+    def summary(self):
+        d = self.as_dict()
+        reasons = ', '.join(f'{n} {reason}' for reason, n in d['removed'].items())
+        return (f"{d['folded']} folded, {d['simplified']} simplified, "
+                f"{len(self.removed)} statement(s) removed" + (f' ({reasons})' if reasons else '') +
+                (f', {len(self.blocks)} empty block(s) dropped' if self.blocks else ''))
+
+
+class _Optimizer(Transformer):
+    def __init__(self, report):
+        self.report = report
+
+    def remove(self, reason, node):
+        self.report.removed.append((reason, node.pos))
+
+    def block(self, body):
+        for i, node in enumerate(body):
+            if type(node) is Return and i + 1 < len(body):
+                for dead in body[i + 1:]:
+                    self.remove(UNREACHABLE, dead)
+                return body[:i + 1]
+        return body
+
+    def decide(self, test):
+        # True/False if the comparison is decided at compile time, else None
+        if type(test) is Compare and type(test.left) is Num and type(test.right) is Num:
+            self.report.folded += 1
+            return DECIDE[test.op](test.left.value, test.right.value)
+        return None
+
+    def leave_If(self, node):
+        if type(node.test) is not Compare:
+            return node  # an Error from syntax error recovery
+        known = self.decide(node.test)
+        if known is False:
+            self.remove(DEAD_BRANCH, node)
+            return []
+        if known is True:
+            self.remove(CONSTANT_CONDITION, node)
+            return node.body
+        if not node.body and not _can_fail(node.test):
+            self.remove(EMPTY_BLOCK, node)
+            return []
+        return node
+
+    def leave_IfElse(self, node):
+        if type(node.test) is not Compare:
+            return node
+        known = self.decide(node.test)
+        if known is not None:
+            self.remove(DEAD_BRANCH, node)
+            return node.body if known else node.orelse
+        test, body, orelse = node.test, node.body, node.orelse
+        if not body and not orelse and not _can_fail(test):
+            self.remove(EMPTY_BLOCK, node)
+            return []
+        if not orelse:
+            self.report.blocks.append(('else', node.pos))
+            return If(test, body, node.pos)
+        if not body:
+            self.report.blocks.append(('if', node.pos))
+            return If(Compare(NEGATE[test.op], test.left, test.right, test.pos), orelse, node.pos)
+        return node
+
+    def leave_While(self, node):
+        if self.decide(node.test) is False:
+            self.remove(DEAD_BRANCH, node)
+            return []
+        return node
+
+    def leave_BinOp(self, node):
+        left, right, op = node.left, node.right, node.op
+        lnum = left.value if type(left) is Num else None
+        rnum = right.value if type(right) is Num else None
+        if lnum is not None and rnum is not None and not (op == '/' and rnum == 0):
+            self.report.folded += 1
+            return Num(FOLD[op](lnum, rnum), node.pos)
+        if (rnum == 0 and op in '+-') or (rnum == 1 and op in '*/'):
+            self.report.simplified += 1
+            return left
+        if (lnum == 0 and op == '+') or (lnum == 1 and op == '*'):
+            self.report.simplified += 1
+            return right
+        if op == '*' and ((lnum == 0 and not _can_fail(right)) or (rnum == 0 and not _can_fail(left))):
+            self.report.simplified += 1
+            return Num(0, node.pos)
+        return node
+
+
+def _can_fail(node):
+    # True if evaluating node might divide by zero
+    for sub in iter_nodes(node):
+        if type(sub) is BinOp and sub.op == '/' and not (type(sub.right) is Num and sub.right.value != 0):
+            return True
+    return False
+
+
+def optimize(tree):
+    # (optimised tree, Report).  tree: a Program, a FunctionDef, a single
+    # statement (the if and ifelse dialects) or a list of statements.  A
+    # single statement that is removed or replaced by several comes back as
+    # a Program.
+    report = Report()
+    if tree is None:
+        return None, report
+    result = _Optimizer(report).transform(tree)
+    if isinstance(result, list) and not isinstance(tree, list):
+        if len(result) == 1 and type(result[0]) is type(tree):
+            return result[0], report
+        return Program(result, tree.pos), report
+    return result, report
+
+
+def main(argv=None):
+    from .registry import get_grammar, grammar_names
+
+    ap = argparse.ArgumentParser(prog='python -m miniparsers.optimize',
+                                 description='Optimise a program and report what was removed.')
+    ap.add_argument('path', help='program to optimise')
+    ap.add_argument('-g', '--grammar', default='while', choices=grammar_names(),
+                    help='dialect of the program (default: while)')
+    ap.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = ap.parse_args(argv)
+
+    with open(args.path) as f:
+        tree, found = get_grammar(args.grammar).check(f.read())
+    if found:
+        for d in found:
+            print(f'{where(d)}{d.message}', file=sys.stderr)
+        return 1
+    tree, report = optimize(tree)
+    if args.json:
+        json.dump(report.as_dict(), sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        print(tree)
+        print(report.summary())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
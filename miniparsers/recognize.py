@@ -0,0 +1,197 @@
+from . import diagnostics
+from .bytelex import ByteLexer
+from .stream import CHUNK_SIZE, StreamLexer
+
+# Recognizer-only parsing.
+#
+# validate() runs the LALR automaton of a grammar over the token stream but
+# never calls the p_* actions: a reduction just pops the right-hand side off
+# the state stack and pushes the goto state.  No YaccProduction or YaccSymbol
+# objects are created and no AST is built.  The answer is the same as asking
+# whether parser.parse() finishes without a lexical or syntax error.
+#
+# diagnose() also recovers from syntax errors the way ply.yacc does, with the
+# error productions of the grammar, and reports every error parser.parse()
+# would report, still without building a tree.  validate_stream() and
+# check_stream() run the recognizer over a StreamLexer, so a file of any
+# size is checked holding one chunk of it and the parser stacks in memory:
+#
+#   with open('big.c') as f:
+#       diagnostics = check_stream(get_grammar('while'), f)
+#
+# The diagnostics are those of diagnostics.check() on the whole text, with
+# their lines and columns.
+
+
+ERROR_COUNT = 3  # shifts before ply.yacc reports errors again (yacc.error_count)
+
+
+class Recognizer:
+    def __init__(self, parser):
+        self.action = parser.action
+        self.goto = parser.goto
+        # Rule number -> (length of right-hand side, left-hand side)
+        self.rules = [(p.len, p.name) for p in parser.productions]
+        self.defaulted = parser.defaulted_states
+
+    def accepts(self, get_token):
+        action = self.action
+        goto = self.goto
+        rules = self.rules
+        states = [0]
+        tok = get_token()
+        lookahead = tok.type if tok is not None else '$end'
+        while True:
+            t = action[states[-1]].get(lookahead)
+            if t is None:
+                return False
+            if t > 0:
+                states.append(t)
+                tok = get_token()
+                lookahead = tok.type if tok is not None else '$end'
+            elif t < 0:
+                length, name = rules[-t]
+                if length:
+                    del states[-length:]
+                states.append(goto[states[-1]][name])
+            else:
+                return True
+
+
+    def diagnose(self, get_token, error):
+        # Run to the end of the input, calling error(token) (None at EOF) for
+        # every syntax error parser.parse() would report.  The error recovery
+        # of ply.yacc, including its states that reduce without reading a
+        # lookahead, on a stack of states and one of symbol names.
+        action = self.action
+        goto = self.goto
+        rules = self.rules
+        defaulted = self.defaulted
+        states = [0]
+        symbols = ['$end']
+        pending = []  # lookaheads put back behind an 'error' symbol
+        look = None   # (type, token) of the lookahead
+        errorcount = 0
+        while True:
+            state = states[-1]
+            if state in defaulted:
+                t = defaulted[state]
+            else:
+                if look is None:
+                    if pending:
+                        look = pending.pop()
+                    else:
+                        tok = get_token()
+                        look = (tok.type, tok) if tok is not None else ('$end', None)
+                t = action[state].get(look[0])
+            if t is not None:
+                if t > 0:
+                    states.append(t)
+                    symbols.append(look[0])
+                    look = None
+                    if errorcount:
+                        errorcount -= 1
+                elif t < 0:
+                    length, name = rules[-t]
+                    if length:
+                        del states[-length:]
+                        del symbols[-length:]
+                    symbols.append(name)
+                    states.append(goto[states[-1]][name])
+                else:
+                    return
+                continue
+            if not errorcount:
+                error(look[1])
+            errorcount = ERROR_COUNT
+            if len(states) <= 1 and look[0] != '$end':
+                look = None
+                del pending[:]
+            elif look[0] == '$end':
+                return
+            elif look[0] != 'error':
+                if symbols[-1] == 'error':
+                    look = None
+                else:
+                    pending.append(look)
+                    look = ('error', None)
+            else:
+                states.pop()
+                symbols.pop()
+
+
+class _LexFailure(Exception):
+    pass
+
+
+def _lex_error(t):
+    raise _LexFailure
+
+
+def validate(grammar, text):
+    # text may be a str or a bytes-like buffer (bytes, bytearray, mmap)
+    recognizer = grammar.recognizer
+    if isinstance(text, str):
+        lexer = grammar.lexer()
+    else:
+        lexer = ByteLexer(grammar.reserved)
+    saved = lexer.lexerrorf
+    lexer.lexerrorf = _lex_error
+    lexer.input(text)
+    try:
+        return recognizer.accepts(lexer.token)
+    except _LexFailure:
+        return False
+    finally:
+        lexer.lexerrorf = saved
+
+
+def validate_stream(grammar, f, chunk_size=CHUNK_SIZE):
+    # validate() of a text file object, read chunk by chunk
+    lexer = grammar.lexer()
+    saved = lexer.lexerrorf
+    lexer.lexerrorf = _lex_error
+    try:
+        return grammar.recognizer.accepts(StreamLexer(lexer, f, chunk_size).token)
+    except _LexFailure:
+        return False
+    finally:
+        lexer.lexerrorf = saved
+
+
+class _StreamSink(diagnostics.ListSink):
+    # Completes diagnostics while the chunk they point into is the current
+    # one: a chunk starts at the start of a line, so the column is the
+    # distance from the last newline before the error in it
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def emit(self, diagnostic):
+        stream = self.stream
+        if diagnostic.pos is None:
+            diagnostic.line = stream.lineno  # an error at EOF is on the last line
+        else:
+            pos = diagnostic.pos - stream.base
+            diagnostic.column = pos - stream.lexer.lexdata.rfind('\n', 0, pos)
+        super().emit(diagnostic)
+
+
+def check_stream(grammar, f, chunk_size=CHUNK_SIZE):
+    # The diagnostics of diagnostics.check() for a text file object, read
+    # chunk by chunk without building a tree
+    lexer = grammar.lexer()
+    stream = StreamLexer(lexer, f, chunk_size)
+    saved = lexer.lexerrorf
+
+    def lex_error(t):
+        t.lexpos += stream.base  # the lexer only knows offsets in its chunk
+        saved(t)
+
+    lexer.lexerrorf = lex_error
+    try:
+        with diagnostics.using(_StreamSink(stream)) as collected:
+            grammar.recognizer.diagnose(stream.token, diagnostics.syntax_error)
+    finally:
+        lexer.lexerrorf = saved
+    return collected.diagnostics
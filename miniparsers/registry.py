@@ -0,0 +1,244 @@
+import importlib
+
+from .bytelex import ByteLexer, mapped
+from .cache import grammar_signature
+from . import diagnostics
+from .lexer import get_lexer
+from . import recognize
+from .stream import CHUNK_SIZE, StreamLexer
+from .tables import build_parser
+from .tokbuf import BufferLexer, tokenize, tokenize_parallel
+
+# Grammar registry.
+#
+# A registered grammar is only a name and a module path until it is first
+# used: the grammar module is imported and its LALR tables are loaded (or
+# built) on the first parse, so a caller that needs one dialect never reflects
+# over the others.  All dialects share the lexer from miniparsers.lexer.
+
+
+class Grammar:
+    def __init__(self, name, module_name):
+        self.name = name
+        self.module_name = module_name
+        self._module = None
+        self._parser = None
+        self._recognizer = None
+        self._signature = None
+        self.stats = None  # set by miniparsers.instrument.ParseStats.attach()
+        self.cache = None  # a miniparsers.cache.ParseCache, if results should be cached
+
+    def __repr__(self):
+        return f'Grammar({self.name!r}, {self.module_name!r})'
+
+    @property
+    def module(self):
+        if self._module is None:
+            self._module = importlib.import_module(self.module_name)
+        return self._module
+
+    @property
+    def reserved(self):
+        return self.module.reserved
+
+    @property
+    def loaded(self):
+        return self._parser is not None
+
+    @property
+    def parser(self):
+        if self._parser is None:
+            self._parser = build_parser(self.module, name=self.name)
+        return self._parser
+
+    @property
+    def signature(self):
+        if self._signature is None:
+            self._signature = grammar_signature(self)
+        return self._signature
+
+    @property
+    def recognizer(self):
+        if self._recognizer is None:
+            self._recognizer = recognize.Recognizer(self.parser)
+        return self._recognizer
+
+    def lexer(self):
+        # The shared lexer, switched to this dialect's keywords
+        lexer = get_lexer()
+        lexer.reserved = self.module.reserved
+        lexer.lineno = 1
+        return lexer
+
+    def parse(self, text):
+        if self.cache is not None:
+            # Cached with its diagnostics, which are replayed to the current
+            # sink on every call, hit or miss
+            tree, found = self.cache.lookup(self, 'parse-diagnostics', text, self._parse_recorded)
+            if found:
+                sink = diagnostics.get_sink()
+                for d in found:
+                    sink.emit(d)
+            return tree
+        return self._parse_text(text)
+
+    def _parse_recorded(self, text):
+        with diagnostics.using(diagnostics.ListSink()) as collected:
+            tree = self._parse_text(text)
+        return tree, collected.diagnostics
+
+    def _parse_text(self, text):
+        lexer = self.lexer()
+        lexer.input(text)
+        return self._parse(lexer)
+
+    def _parse(self, lexer):
+        if self.stats is not None:
+            return self.stats.parse(self.parser, lexer)
+        return self.parser.parse(lexer=lexer)
+
+    def validate(self, text):
+        # True if text parses without errors; runs no grammar actions
+        if self.cache is not None:
+            return self.cache.lookup(self, 'validate', text, self._validate)
+        return recognize.validate(self, text)
+
+    def _validate(self, text):
+        return recognize.validate(self, text)
+
+    def check(self, text):
+        # (tree, diagnostics) with every error of text, found in one pass
+        if self.cache is not None:
+            return self.cache.lookup(self, 'check', text, self._check)
+        return diagnostics.check(self, text)
+
+    def _check(self, text):
+        return diagnostics.check(self, text)
+
+    def compile(self, text, optimize=False):
+        # Compile text to bytecode for miniparsers.vm; ValueError on syntax errors
+        from . import vm  # deferred so importing stays cheap
+        return vm.compile_tree(*self._program(text, optimize))
+
+    def run(self, text, variables=None, max_steps=None, timeout=None, optimize=False):
+        # Execute text on miniparsers.vm and return its variables
+        from . import vm  # deferred so importing stays cheap
+        return vm.run(self.compile(text, optimize), variables, max_steps, timeout)
+
+    def transpile(self, text, optimize=False):
+        # A Python callable for text, compiled through miniparsers.transpile;
+        # the code object is cached by content
+        from .transpile import codes, load  # deferred so importing stays cheap
+        if optimize:
+            return load(codes.lookup(self, 'pycode-optimized', text, self._transpile_optimized))
+        return load(codes.lookup(self, 'pycode', text, self._transpile))
+
+    def _transpile(self, text, optimize=False):
+        from .transpile import compile_tree
+        tree, names = self._program(text, optimize)
+        return compile_tree(tree, f'<{self.name}>', names)
+
+    def _transpile_optimized(self, text):
+        return self._transpile(text, optimize=True)
+
+    def _program(self, text, optimize=False):
+        # (tree of text, variable names to keep), or ValueError if it has
+        # syntax errors.  With optimize, the tree is run through
+        # miniparsers.optimize (which leaves the possibly cached tree as it
+        # is) and the names are those of the original tree, so that running
+        # the program reports the variables of eliminated code too.
+        tree, errors = self.check(text)
+        if errors:
+            first = errors[0]
+            more = f' (and {len(errors) - 1} more)' if len(errors) > 1 else ''
+            raise ValueError(f'{diagnostics.where(first)}{first.message}{more}')
+        if optimize:
+            from .optimize import optimize as optimize_tree
+            from .transpile import program_variables
+            return optimize_tree(tree)[0], program_variables(tree)
+        return tree, ()
+
+    def parse_sharded(self, text, jobs=None, trees=True):
+        # (Program, diagnostics) of a file of many function definitions,
+        # parsed on a process pool; see miniparsers.shard.  ValueError for the
+        # dialects other than function
+        from .shard import parse_sharded  # deferred so importing stays cheap
+        return parse_sharded(self, text, jobs, trees)
+
+    def tokenize(self, text, jobs=1):
+        # Lex text into a struct-of-arrays TokenBuffer; see miniparsers.tokbuf.
+        # jobs other than 1 lexes line-aligned pieces on a process pool
+        # (None: one per CPU), with the same result
+        if jobs != 1:
+            return tokenize_parallel(text, self.module.reserved, jobs=jobs)
+        return tokenize(text, self.module.reserved)
+
+    def parse_tokens(self, buf):
+        return self._parse(BufferLexer(buf))
+
+    def parse_bytes(self, data):
+        # data may be bytes, bytearray or an mmap; see miniparsers.bytelex
+        lexer = ByteLexer(self.module.reserved)
+        lexer.input(data)
+        return self._parse(lexer)
+
+    def parse_file(self, path):
+        with mapped(path) as data:
+            return self.parse_bytes(data)
+
+    def parse_stream(self, f, chunk_size=CHUNK_SIZE):
+        # Parse a text file object chunk by chunk instead of reading it whole;
+        # the text is not held in memory, but the tree of all of it is
+        return self._parse(StreamLexer(self.lexer(), f, chunk_size))
+
+    def validate_stream(self, f, chunk_size=CHUNK_SIZE):
+        # validate() of a text file object, read chunk by chunk
+        return recognize.validate_stream(self, f, chunk_size)
+
+    def check_stream(self, f, chunk_size=CHUNK_SIZE):
+        # The diagnostics of check() for a text file object, read chunk by
+        # chunk; no tree is built, so memory does not grow with the file
+        return recognize.check_stream(self, f, chunk_size)
+
+
+_grammars = {}
+
+
+def register(name, module_name):
+    if name in _grammars:
+        raise ValueError(f'Grammar {name!r} is already registered')
+    grammar = _grammars[name] = Grammar(name, module_name)
+    return grammar
+
+
+def get_grammar(name):
+    try:
+        return _grammars[name]
+    except KeyError:
+        raise KeyError(f'Unknown grammar {name!r}; expected one of {", ".join(_grammars)}') from None
+
+
+def grammar_names():
+    return list(_grammars)
+
+
+def get_parser(name):
+    return get_grammar(name).parser
+
+
+def parse(name, text):
+    return get_grammar(name).parse(text)
+
+
+def validate(name, text):
+    return get_grammar(name).validate(text)
+
+
+def check(name, text):
+    return get_grammar(name).check(text)
+
+
+register('if', 'miniparsers.grammars.if_statement')
+register('ifelse', 'miniparsers.grammars.if_else')
+register('while', 'miniparsers.grammars.while_loop')
+register('function', 'miniparsers.grammars.function_definition')
@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from . import diagnostics, recognize
+from .diagnostics import Diagnostic, where
+from .lines import LineIndex
+from .nodes import Error, Program
+from .registry import get_grammar
+from .walk import iter_nodes
+
+# Parallel parsing of one large file of many function definitions.
+#
+#   tree, diagnostics = parse_sharded(get_grammar('function'), text, jobs=8)
+#   tree.body          # one FunctionDef per top-level definition, in order
+#   _, diagnostics = parse_sharded(grammar, text, trees=False)
+#
+#   python -m miniparsers.shard -g function big.txt [--jobs N] [--json]
+#
+# The function dialect parses a single function_definition, so a file of
+# many of them is a sequence of units.  units() finds their boundaries in
+# one pass over the braces (and the // comments, whose braces do not count):
+# a unit ends where a '}' brings the depth back to 0.  Text before the first
+# unit belongs to it and text after the last one to the last, so stray
+# tokens are reported where a parse of that unit would report them.  The
+# other dialects parse a single program whose statements are not delimited
+# by braces, so splitting them this way would change their trees; only the
+# function dialect (SHARDED) is accepted.
+#
+# Consecutive units are grouped into shards of about the same size, several
+# per worker, and each worker parses its shards unit by unit with
+# diagnostics.check().  Positions and line numbers are moved from the unit to
+# the file before the results come back, so the parent only concatenates
+# them: the result is the same as parsing every unit in turn in one process
+# (jobs=1).  A unit that cannot be parsed at all stands in the body as an
+# Error node at its offset.  Results whose trees nest too deeply to pickle
+# are parsed again in the parent.  Unpickling the trees is the part that
+# stays serial; with trees=False workers only recognize valid units (see
+# miniparsers.recognize) and send back diagnostics, so checking a file scales
+# with the cores.
+
+SHARDS_PER_JOB = 4
+MIN_PARALLEL = 1 << 16  # smaller texts are parsed in-process
+SHARDED = ('function',)  # dialects whose files are sequences of units
+
+_BRACES = re.compile(r'//[^\n]*|[{}]')
+
+_grammar = None
+
+
+def units(text):
+    # [(start, end)] offsets of the top-level units of text
+    bounds = []
+    start = depth = 0
+    for m in _BRACES.finditer(text):
+        brace = m.group()
+        if brace == '{':
+            depth += 1
+        elif brace == '}':
+            depth -= 1
+            if depth <= 0:
+                depth = 0
+                bounds.append((start, m.end()))
+                start = m.end()
+    if bounds:
+        bounds[-1] = (bounds[-1][0], len(text))
+    elif text.strip():
+        bounds.append((0, len(text)))
+    return bounds
+
+
+def shards(text, bounds, count):
+    # Group bounds into at most count runs of consecutive units of similar
+    # size: [(start offset, start line, [(start, end)] relative to start)]
+    if not bounds:
+        return []
+    size = max(1, len(text) // max(1, count))
+    groups = []
+    line = 1
+    first = 0
+    for i, (start, end) in enumerate(bounds):
+        if end - bounds[first][0] >= size or i == len(bounds) - 1:
+            origin = bounds[first][0]
+            groups.append((origin, line, [(s - origin, e - origin) for s, e in bounds[first:i + 1]]))
+            line += text.count('\n', origin, end)
+            first = i + 1
+    return groups
+
+
+def parse_shard(grammar, text, origin, line, bounds, trees=True):
+    # [(tree, diagnostics)] of every unit of one shard, in file coordinates;
+    # without trees, valid units are only recognized and every tree is None
+    results = []
+    for start, end in bounds:
+        unit = text[start:end]
+        offset = origin + start
+        if not trees and recognize.validate(grammar, unit):
+            results.append((None, []))
+            line += unit.count('\n')
+            continue
+        # Not grammar.check(): a tree from its cache must not be moved in place
+        tree, found = diagnostics.check(grammar, unit)
+        if not trees:
+            tree = None
+        elif tree is None:
+            tree = Error(offset)
+        elif offset:
+            for node in iter_nodes(tree):
+                node.pos += offset
+        found = [Diagnostic(d.kind, d.message, None if d.line is None else d.line + line - 1,
+                            None if d.pos is None else d.pos + offset, d.column) for d in found]
+        results.append((tree, found))
+        line += unit.count('\n')
+    return results
+
+
+def _init_worker(name):
+    global _grammar
+    _grammar = get_grammar(name)
+    _grammar.parser
+
+
+def _parse_shard(args):
+    return parse_shard(_grammar, *args)
+
+
+def parse_sharded(grammar, text, jobs=None, trees=True):
+    # (Program of the units of text, their diagnostics in file order).  With
+    # trees=False the Program is None and only the diagnostics come back,
+    # which spares the parent from unpickling every tree.
+    if grammar.name not in SHARDED:
+        raise ValueError(f'Cannot shard the {grammar.name} dialect; only {", ".join(SHARDED)} files are '
+                         f'sequences of top-level definitions')
+    jobs = jobs or os.cpu_count() or 1
+    bounds = units(text)
+    if jobs == 1 or len(bounds) < 2 or len(text) < MIN_PARALLEL:
+        parts = [parse_shard(grammar, text, 0, 1, bounds, trees)]
+    else:
+        groups = shards(text, bounds, jobs * SHARDS_PER_JOB)
+        work = [(text[origin:origin + b[-1][1]], origin, line, b, trees) for origin, line, b in groups]
+        grammar.parser  # build or load the tables once, before any worker starts
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(grammar.name,)) as pool:
+            futures = [pool.submit(_parse_shard, args) for args in work]
+            parts = []
+            for args, future in zip(work, futures):
+                try:
+                    parts.append(future.result())
+                except RecursionError:
+                    parts.append(parse_shard(grammar, *args))
+    body = []
+    found = []
+    for part in parts:
+        for tree, errors in part:
+            body.append(tree)
+            found.extend(errors)
+    if found:
+        # A unit may start in the middle of a line, so columns are taken
+        # from the whole text
+        index = LineIndex(text)
+        for d in found:
+            if d.pos is not None:
+                d.column = index.column(d.pos)
+    return (Program(body, 0) if trees else None), found
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='python -m miniparsers.shard',
+                                 description='Parse a file of many function definitions on every core.')
+    ap.add_argument('path', help='file to parse')
+    ap.add_argument('-g', '--grammar', default='function', choices=SHARDED,
+                    help='dialect of the file (default: function)')
+    ap.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: one per CPU)')
+    ap.add_argument('--json', action='store_true', help='print the diagnostics as JSON lines')
+    args = ap.parse_args(argv)
+
+    with open(args.path) as f:
+        text = f.read()
+    _, found = parse_sharded(get_grammar(args.grammar), text, args.jobs, trees=False)
+    for d in found:
+        if args.json:
+            sys.stdout.write(json.dumps(d.as_dict()) + '\n')
+        else:
+            print(f'{where(d)}{d.message}')
+    if not args.json:
+        print(f'{len(units(text))} definition(s), {len(found)} error(s)')
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# Streaming input for the shared lexer.
+#
+# No token can span a newline: identifiers, numbers and operators never contain
+# one and a // comment stops in front of it.  StreamLexer therefore reads the
+# input in chunks, cuts every chunk after its last newline and carries the rest
+# over to the next chunk, so tokens such as '==', '<=' or an identifier that
+# straddle a chunk boundary are lexed whole.  Only one chunk (or one line, if a
+# line is longer than a chunk) is held in memory at a time.
+
+CHUNK_SIZE = 1 << 16
+
+
+class StreamLexer:
+    def __init__(self, lexer, f, chunk_size=CHUNK_SIZE):
+        self.lexer = lexer
+        self.f = f
+        self.chunk_size = chunk_size
+        self.base = 0       # offset of the current segment in the whole input
+        self.pending = ''   # text read after the last newline of a chunk
+        self.eof = False
+        lexer.input('')
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    def input(self, data):
+        raise TypeError('StreamLexer reads its input from a file object')
+
+    def token(self):
+        while True:
+            tok = self.lexer.token()
+            if tok is not None:
+                tok.lexpos += self.base
+                return tok
+            if not self.fill():
+                return None
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    def fill(self):
+        # Hand the lexer the next run of complete lines
+        if self.eof:
+            return False
+        self.base += len(self.lexer.lexdata)
+        pieces = [self.pending]
+        while True:
+            chunk = self.f.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+                self.pending = ''
+                break
+            cut = chunk.rfind('\n') + 1
+            if cut:
+                pieces.append(chunk[:cut])
+                self.pending = chunk[cut:]
+                break
+            pieces.append(chunk)
+        self.lexer.input(''.join(pieces))
+        return True
@@ -0,0 +1,176 @@
+import hashlib
+import importlib
+import os
+import sys
+
+# Persistent LALR table cache.
+#
+# yacc.yacc() with default arguments writes parsetab.py and parser.out into the
+# directory of the calling module, so every grammar overwrites the tables of the
+# others and rebuilds them on start.  build_parser() keeps one pickled table
+# file per grammar in a dedicated directory instead.  The file name carries a
+# hash of the grammar signature, so a changed grammar gets a new entry and the
+# stale one is removed.
+#
+# Tables reflected from docstrings cannot be built under python -OO, which
+# strips them.  python -m miniparsers.aot writes the tables of every dialect
+# as plain Python modules into the miniparsers.compiled package; when one is
+# there and was built from the current sources, build_parser() binds it to
+# the grammar module without reflecting at all.
+
+CACHE_DIR = os.environ.get('AFLL_TABLE_DIR') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '__parsetabs__')
+
+COMPILED = __package__ + '.compiled'
+
+# Sources the compiled tables and the grammar signature depend on, besides
+# the grammar module itself.  Cached check() results pickle Diagnostic
+# objects, so diagnostics.py is one of them, and the lexers that produce the
+# tokens and offsets of str and bytes input are too.
+SOURCES = ('lexer.py', 'fastlex.py', 'bytelex.py', 'nodes.py', 'diagnostics.py')
+
+
+def grammar_name(module):
+    # Scripts run as __main__, so name the grammar after its file
+    return os.path.splitext(os.path.basename(module.__file__))[0]
+
+
+def reflect(module):
+    import ply.yacc as yacc
+    pdict = dict((k, getattr(module, k)) for k in dir(module))
+    pinfo = yacc.ParserReflect(pdict, log=yacc.NullLogger())
+    pinfo.get_all()
+    return pinfo
+
+
+def table_path(name, signature, cache_dir=None):
+    digest = hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir or CACHE_DIR, f'{name}-{digest}.pickle')
+
+
+def load_parser(pinfo, path):
+    # Same steps yacc.yacc() takes for up-to-date tables, minus the second reflection
+    import ply.yacc as yacc
+    lr = yacc.LRTable()
+    if lr.read_pickle(path) != pinfo.signature():
+        return None
+    lr.bind_callables(pinfo.pdict)
+    return yacc.LRParser(lr, pinfo.error_func)
+
+
+def source_digest(module, sources=SOURCES):
+    # Hash of the grammar module and of the shared sources; None when one of
+    # them cannot be read, e.g. in an image that only ships .pyc files
+    h = hashlib.sha1()
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        for path in [module.__file__] + [os.path.join(here, name) for name in sources]:
+            with open(path, 'rb') as f:
+                h.update(f.read())
+    except (OSError, TypeError):
+        return None
+    return h.hexdigest()
+
+
+def compiled_tables(module, name=None):
+    # The miniparsers.compiled module of the grammar, or None if there is none
+    # or it was built from other sources.  Without readable sources there is
+    # nothing to compare with, and the module is trusted as shipped.
+    name = name or grammar_name(module)
+    try:
+        tables = importlib.import_module(f'{COMPILED}.{name}_parsetab')
+    except ImportError:
+        return None
+    current = source_digest(module)
+    if current is not None and current != tables._source:
+        return None
+    return tables
+
+
+def compiled_lextab():
+    # The compiled ply.lex tables of the shared lexer, or None
+    import ply.lex as lex
+    from . import lexer
+    try:
+        lextab = importlib.import_module(f'{COMPILED}.lextab')
+    except ImportError:
+        return None
+    if lextab._tabversion != lex.__tabversion__:
+        return None
+    current = source_digest(lexer, ())
+    if current is not None and current != lextab._source:
+        return None
+    return lextab
+
+
+def load_compiled(module, name=None):
+    # Same steps as load_parser(), from the literal tables of a compiled
+    # module: the p_ functions are looked up by name, not reflected
+    import ply.yacc as yacc
+    tables = compiled_tables(module, name)
+    if tables is None:
+        return None
+    lr = yacc.LRTable()
+    try:
+        lr.read_table(tables)
+    except yacc.VersionError:
+        return None
+    lr.bind_callables(vars(module))
+    return yacc.LRParser(lr, getattr(module, 'p_error', None))
+
+
+def build_parser(module, name=None, cache_dir=None, compiled=True):
+    # ply is imported on first use, so importing a grammar module stays cheap
+    import ply.yacc as yacc
+    cache_dir = cache_dir or CACHE_DIR
+    name = name or grammar_name(module)
+    if compiled:
+        parser = load_compiled(module, name)
+        if parser is not None:
+            return parser
+    if sys.flags.optimize >= 2:
+        raise RuntimeError(f'grammar {name!r}: python -OO strips the docstrings the tables are built '
+                           f'from; run python -m miniparsers.aot without -OO first')
+    pinfo = reflect(module)
+    path = table_path(name, pinfo.signature(), cache_dir)
+
+    try:
+        parser = load_parser(pinfo, path)
+        if parser is not None:
+            return parser
+    except Exception:
+        # Missing, truncated or out-of-date table file: rebuild it below
+        pass
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return yacc.yacc(module=module, debug=False, write_tables=False)
+
+    # Write under a private name and rename, so a concurrent reader never sees
+    # a half-written table file
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        parser = yacc.yacc(module=module, debug=False, picklefile=tmp)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    prune(name, path, cache_dir)
+    return parser
+
+
+def prune(name, keep, cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    for entry in os.listdir(cache_dir):
+        if entry.rsplit('-', 1)[0] != name or not entry.endswith('.pickle'):
+            continue
+        path = os.path.join(cache_dir, entry)
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
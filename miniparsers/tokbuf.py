@@ -0,0 +1,232 @@
+import os
+from array import array
+from itertools import chain, repeat
+
+from . import lexer as rules
+from .lines import LineIndex
+from .fastlex import OPERATORS, FastLexer, FastToken, lexemes
+
+# Struct-of-arrays token buffer.
+#
+# A TokenBuffer holds a whole token stream as four parallel arrays instead of
+# one object per token:
+#
+#   types    token type code, an index into TYPES        array('B')
+#   starts   offset of the token in the source text      array('Q')
+#   lengths  length of the token text                    array('I')
+#   lines    line number                                 array('I')
+#
+# plus the source text itself, from which token values are sliced on demand.
+# That is 17 bytes per token against a few hundred for a token object with its
+# value.  BufferLexer is the thin adapter the parsers read from: it has the
+# token() method of a lexer and only creates a token object for the token the
+# parser asks for next.
+#
+# Lexical errors are reported to t_error while the buffer is filled, so they
+# come before any syntax error of the same parse rather than interleaved with
+# them.
+
+TYPES = list(rules.tokens)
+CODES = {name: code for code, name in enumerate(TYPES)}
+NUMBER_CODE = CODES['NUMBER']
+
+
+class TokenBuffer:
+    def __init__(self, text=''):
+        self.text = text
+        self.types = array('B')
+        self.starts = array('Q')
+        self.lengths = array('I')
+        self.lines = array('I')
+        self.lineno = 1  # line number after the last character
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, i):
+        return self.token(i)
+
+    def token(self, i):
+        start = self.starts[i]
+        value = self.text[start:start + self.lengths[i]]
+        code = self.types[i]
+        tok = FastToken()
+        tok.type = TYPES[code]
+        tok.value = int(value) if code == NUMBER_CODE else value
+        tok.lineno = self.lines[i]
+        tok.lexpos = start
+        return tok
+
+    def __iter__(self):
+        text = self.text
+        names = TYPES
+        Token = FastToken
+        for code, start, length, line in zip(self.types, self.starts, self.lengths, self.lines):
+            tok = Token()
+            tok.type = names[code]
+            value = text[start:start + length]
+            tok.value = int(value) if code == NUMBER_CODE else value
+            tok.lineno = line
+            tok.lexpos = start
+            yield tok
+
+    def columns(self, index=None):
+        # Column of every token, counted from 1, in an array('I') parallel to
+        # the others; index: a miniparsers.lines.LineIndex of the text, if
+        # one was built already
+        if index is None:
+            index = LineIndex(self.text)
+        return array('I', map(index.column, self.starts))
+
+    def nbytes(self):
+        # Memory held by the arrays, not counting the source text
+        return sum(a.itemsize * len(a) for a in (self.types, self.starts, self.lengths, self.lines))
+
+    def numpy(self):
+        # Zero-copy NumPy views of the arrays (needs numpy)
+        import numpy
+        return {name: numpy.frombuffer(getattr(self, name), dtype=getattr(self, name).typecode)
+                for name in ('types', 'starts', 'lengths', 'lines')}
+
+
+def tokenize(text, reserved=None, lexerrorf=None):
+    # Lex text into a TokenBuffer; same tokens as FastLexer(reserved)
+    buf = TokenBuffer(text)
+    _, buf.lineno = _lex(buf, text, reserved, lexerrorf, 0, len(text), 1)
+    return buf
+
+
+def _lex(buf, text, reserved, lexerrorf, pos, end, lineno):
+    # Append the tokens of text[pos:end] to buf, counting lines from lineno,
+    # and return (pos, lineno) where lexing stopped: end, or past it if an
+    # error handler skipped further
+    reserved = rules.reserved if reserved is None else reserved
+    types = buf.types.append
+    starts = buf.starts.append
+    lengths = buf.lengths.append
+    lines = buf.lines.append
+    kinds = {lexeme: CODES[kind] for lexeme, kind in OPERATORS.items()}
+    kinds.update((word, CODES[kind]) for word, kind in reserved.items())
+    errors = None
+
+    def error(pos, lineno):
+        # Errors go through a FastLexer, created at the first one
+        nonlocal errors
+        if errors is None:
+            errors = FastLexer(reserved)
+            if lexerrorf is not None:
+                errors.lexerrorf = lexerrorf
+            errors.input(text)
+        return errors.error(pos, lineno)
+
+    for code, start, lexeme, line in lexemes(text, pos, end, lineno, kinds, CODES['IDENTIFIER'], NUMBER_CODE, error):
+        if code is None:
+            return start, line
+        types(code)
+        starts(start)
+        lengths(len(lexeme))
+        lines(line)
+
+
+# Parallel lexing.  No token spans a newline (comments end at one), so every
+# line boundary is a safe place to split.  Workers lex line-aligned regions of
+# the text in place, starting from the region's line number, so their tokens
+# already carry the offsets and lines of the whole text and merging is one
+# array extend per region.  A region in which a worker met a lexical error is
+# lexed again in the parent, so that lexerrorf (t_error by default) sees the
+# same calls in the same order; if its handler skips past the end of the
+# region or changes the line number, the rest of the text is lexed in the
+# parent as well.  The result is identical to tokenize(text).
+
+PARALLEL_CHUNKS_PER_JOB = 4
+MIN_PARALLEL = 1 << 20  # smaller texts are lexed in-process
+
+_text = None
+_reserved = None
+
+
+class _Failed(Exception):
+    pass
+
+
+def _fail(t):
+    raise _Failed
+
+
+def _init_worker(text, reserved):
+    # With the fork start method the text is inherited, not pickled
+    global _text, _reserved
+    _text = text
+    _reserved = reserved
+
+
+def _lex_region(region):
+    start, end, lineno = region
+    buf = TokenBuffer()
+    try:
+        _lex(buf, _text, _reserved, _fail, start, end, lineno)
+    except _Failed:
+        return None
+    return buf.types, buf.starts, buf.lengths, buf.lines
+
+
+def regions(text, count):
+    # [(start, end, lineno)] of up to count line-aligned pieces of text
+    size = max(1, len(text) // max(1, count))
+    found = []
+    start = 0
+    lineno = 1
+    while start < len(text):
+        end = text.find('\n', start + size)
+        end = len(text) if end < 0 else end + 1
+        found.append((start, end, lineno))
+        lineno += text.count('\n', start, end)
+        start = end
+    return found
+
+
+def tokenize_parallel(text, reserved=None, lexerrorf=None, jobs=None):
+    # tokenize(text, reserved, lexerrorf), with the lexing spread over jobs
+    # worker processes
+    from concurrent.futures import ProcessPoolExecutor  # deferred so importing stays cheap
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or not text or len(text) < MIN_PARALLEL:
+        return tokenize(text, reserved, lexerrorf)
+    work = regions(text, jobs * PARALLEL_CHUNKS_PER_JOB)
+    ends = [lineno for _, _, lineno in work[1:]] + [work[-1][2] + text.count('\n', work[-1][0])]
+    buf = TokenBuffer(text)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(text, reserved)) as pool:
+        for (start, end, lineno), last, arrays in zip(work, ends, pool.map(_lex_region, work)):
+            if arrays is not None:
+                buf.types.extend(arrays[0])
+                buf.starts.extend(arrays[1])
+                buf.lengths.extend(arrays[2])
+                buf.lines.extend(arrays[3])
+                continue
+            pos, lineno = _lex(buf, text, reserved, lexerrorf, start, end, lineno)
+            if pos != end or lineno != last:
+                # The handler moved past the region or changed the line count
+                _, buf.lineno = _lex(buf, text, reserved, lexerrorf, pos, len(text), lineno)
+                return buf
+    buf.lineno = ends[-1]
+    return buf
+
+
+class BufferLexer:
+    # Lexer interface over a TokenBuffer, for parser.parse(lexer=...)
+    def __init__(self, buf):
+        self.buf = buf
+        self.lexdata = buf.text
+        self.reset()
+
+    def reset(self):
+        self.lineno = self.buf.lineno
+        self.lexpos = 0
+        # A C-level call per token: the buffer's tokens, then None for ever
+        self.token = chain(self.buf, repeat(None)).__next__
+
+    def input(self, data):
+        raise TypeError('BufferLexer reads its tokens from a TokenBuffer')
+
+    def __iter__(self):
+        return iter(self.token, None)
@@ -0,0 +1,200 @@
+import ast
+
+from .cache import ParseCache
+from .nodes import Assign, BinOp, Compare, Error, FunctionDef, If, IfElse, Name, Num, Program, Return, While
+from .vm import divide
+
+# Python backend: translate a dialect AST to a Python ast.Module, compile()
+# it and run the resulting code object at CPython speed.
+#
+#   program = get_grammar('while').transpile(text)   # cached by content
+#   program({'n': 10})                 # -> {'n': 10, 'i': ...}
+#   f = get_grammar('function').transpile('int f(int a) { return a * 2; }')
+#   f(21)                              # -> 42
+#
+# A statement program (the if, ifelse and while dialects) becomes
+#
+#   def __program__(variables):
+#       v_n = variables.get('n', 0)    # one line per variable of the program
+#       ...                            # the program
+#       return {'n': v_n, ...}
+#
+# so every variable is a fast local.  A function definition becomes a def
+# with the same parameters; its other locals start at 0, and it returns None
+# if it ends without a return.  A nested definition is a nested def with a
+# scope of its own.  Names are prefixed (v_ for variables, f_ for functions)
+# so that a program may use Python keywords and builtins as identifiers.
+# Semantics are those of miniparsers.vm: integers, / truncating towards zero,
+# unset variables reading 0.  Unlike the VM there are no step or time limits,
+# so run untrusted programs on the VM.
+
+ARITHMETIC = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult}
+COMPARISON = {'==': ast.Eq, '!=': ast.NotEq, '<': ast.Lt, '>': ast.Gt, '<=': ast.LtE, '>=': ast.GtE}
+
+# Code objects of Grammar.transpile(), by grammar and input digest.  Code
+# objects do not pickle, so this cache has no disk tier.
+codes = ParseCache(maxsize=256)
+
+
+def _load(name):
+    return ast.Name(f'v_{name}', ast.Load())
+
+
+def _store(name):
+    return ast.Name(f'v_{name}', ast.Store())
+
+
+def _zero():
+    return ast.Constant(0)
+
+
+class _Transpiler:
+    def statements(self, body):
+        out = []
+        for node in body:
+            out.extend(self.statement(node))
+        return out or [ast.Pass()]
+
+    def statement(self, node):
+        kind = type(node)
+        if kind is Assign:
+            return [ast.Assign([_store(node.target)], self.expression(node.value))]
+        if kind is If:
+            return [ast.If(self.expression(node.test), self.statements(node.body), [])]
+        if kind is IfElse:
+            return [ast.If(self.expression(node.test), self.statements(node.body),
+                           self.statements(node.orelse))]
+        if kind is While:
+            return [ast.While(self.expression(node.test), self.statements(node.body), [])]
+        if kind is Return:
+            return [ast.Return(self.expression(node.value))]
+        if kind is FunctionDef:
+            return [self.function(node)]
+        if kind is Error:
+            raise ValueError('Cannot compile a program with syntax errors')
+        raise ValueError(f'Cannot compile {kind.__name__} nodes')
+
+    def expression(self, node):
+        kind = type(node)
+        if kind is Name:
+            return _load(node.id)
+        if kind is Num:
+            return ast.Constant(node.value)
+        if kind is BinOp:
+            left = self.expression(node.left)
+            right = self.expression(node.right)
+            if node.op == '/':
+                return ast.Call(ast.Name('divide', ast.Load()), [left, right], [])
+            return ast.BinOp(left, ARITHMETIC[node.op](), right)
+        if kind is Compare:
+            return ast.Compare(self.expression(node.left), [COMPARISON[node.op]()],
+                               [self.expression(node.right)])
+        raise ValueError(f'Cannot compile {kind.__name__} nodes')
+
+    def function(self, node):
+        params = [p.name for p in node.params]
+        if len(set(params)) != len(params):
+            raise ValueError(f'Function {node.name!r} has duplicate parameters')
+        local = [name for name in variables(node.body) if name not in params]
+        body = [ast.Assign([_store(name) for name in local], _zero())] if local else []
+        body += self.statements(node.body)
+        args = ast.arguments(posonlyargs=[], args=[ast.arg(f'v_{name}') for name in params], vararg=None,
+                             kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+        return ast.FunctionDef(f'f_{node.name}', args, body, [], None)
+
+    def program(self, body, names=()):
+        names = list(dict.fromkeys(list(names) + variables(body)))
+        variables_arg = ast.Name('variables', ast.Load())
+        prologue = [ast.Assign([_store(name)],
+                               ast.Call(ast.Attribute(variables_arg, 'get', ast.Load()),
+                                        [ast.Constant(name), _zero()], []))
+                    for name in names]
+        epilogue = ast.Return(ast.Dict([ast.Constant(name) for name in names], [_load(name) for name in names]))
+        args = ast.arguments(posonlyargs=[], args=[ast.arg('variables')], vararg=None,
+                             kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+        body = self.statements(body)
+        if type(body[-1]) is ast.Pass:
+            body = []
+        return ast.FunctionDef('__program__', args, prologue + body + [epilogue], [], None)
+
+
+def variables(body):
+    # Names assigned or read in body, in order of appearance, without
+    # descending into nested function definitions
+    names = {}
+    stack = list(reversed(body))
+    while stack:
+        node = stack.pop()
+        kind = type(node)
+        if kind is Name:
+            names[node.id] = None
+        elif kind is Assign:
+            names[node.target] = None
+            stack.append(node.value)
+        elif kind in (BinOp, Compare):
+            stack.append(node.right)
+            stack.append(node.left)
+        elif kind in (If, While):
+            stack.extend(reversed(node.body))
+            stack.append(node.test)
+        elif kind is IfElse:
+            stack.extend(reversed(node.orelse))
+            stack.extend(reversed(node.body))
+            stack.append(node.test)
+        elif kind is Return:
+            stack.append(node.value)
+    return list(names)
+
+
+def program_variables(tree):
+    # variables() of a statement program; a function definition returns its
+    # result rather than its variables, so it has none
+    if tree is None or type(tree) is FunctionDef:
+        return []
+    return variables(_body(tree))
+
+
+def _body(tree):
+    return tree.body if type(tree) is Program else tree if isinstance(tree, list) else [tree]
+
+
+def to_module(tree, names=()):
+    # tree: a Program, a FunctionDef, a single statement or a list of
+    # statements.  A statement program also returns names, as in
+    # miniparsers.vm.compile_tree().
+    if tree is None:
+        raise ValueError('Cannot compile a program with syntax errors')
+    transpiler = _Transpiler()
+    if type(tree) is FunctionDef:
+        entry = transpiler.function(tree)
+    else:
+        entry = transpiler.program(_body(tree), names)
+    assign = ast.Assign([ast.Name('__entry__', ast.Store())], ast.Name(entry.name, ast.Load()))
+    return ast.fix_missing_locations(ast.Module([entry, assign], []))
+
+
+def compile_tree(tree, filename='<miniparsers>', names=()):
+    # CPython bounds the nesting it can compile: 20 loops deep, and about a
+    # thousand levels of blocks or expressions.  Deeper programs run on the
+    # VM, which has no such limit.
+    try:
+        return compile(to_module(tree, names), filename, 'exec')
+    except SyntaxError as e:
+        raise ValueError(f'Cannot compile to Python ({e.msg}); run the program on the VM') from None
+    except (RecursionError, MemoryError):
+        raise ValueError('Program nests too deeply to compile to Python; run it on the VM') from None
+
+
+def load(code):
+    # The callable defined by code: program(variables) -> variables for a
+    # statement program, or the function itself for a function definition
+    namespace = {'divide': divide}
+    exec(code, namespace)
+    return namespace['__entry__']
+
+
+def run(code, variables=None):
+    # Same result as miniparsers.vm.run() for a statement program
+    result = dict(variables) if variables else {}
+    result.update(load(code)(result))
+    return result
@@ -0,0 +1,397 @@
+import argparse
+import json
+import sys
+from array import array
+from time import perf_counter
+
+from .nodes import Assign, BinOp, Compare, Error, If, IfElse, Name, Num, Program, While
+
+# Bytecode compiler and virtual machine for the if/while language.
+#
+#   code = compile_tree(get_grammar('while').parse(text))
+#   run(code, {'n': 10}, max_steps=10**6, timeout=1.0)   # -> {'n': 10, 'i': ...}
+#
+#   python -m miniparsers.vm -g while program.txt [--max-steps N] [--timeout S]
+#
+# The VM is register based.  Every variable of a program gets a slot index at
+# compile time, followed by one slot per distinct constant and the scratch
+# slots of nested expressions, so an instruction names all of its operands
+# by index and no name is looked up while the program runs.  Instructions are
+# four words (opcode, a, b, c) in one array('i'):
+#
+#   MOVE a b        slot[a] = slot[b]
+#   ADD a b c       slot[a] = slot[b] + slot[c]   (SUB, MUL, DIV alike)
+#   JUMP a          continue at instruction a
+#   JEQ a b c       continue at instruction c if slot[a] == slot[b]
+#                   (JNE, JLT, JGT, JLE, JGE alike)
+#   HALT
+#
+# A comparison only ever appears as an if/while test, so it is fused with its
+# branch: an if jumps past its body on the negated comparison, and a while is
+# compiled with its test at the bottom, so each iteration takes one branch.
+#
+# Values are Python integers.  Variables start at 0 unless given, and /
+# truncates towards zero as in C.  max_steps bounds the number of
+# instructions executed and timeout the wall time in seconds (checked every
+# CHECK_INTERVAL instructions); either raises LimitExceeded.  Programs with
+# syntax errors cannot be compiled.
+
+CHECK_INTERVAL = 1 << 14
+
+OPCODES = ('HALT', 'MOVE', 'ADD', 'SUB', 'MUL', 'DIV', 'JUMP', 'JEQ', 'JNE', 'JLT', 'JGT', 'JLE', 'JGE')
+(HALT, MOVE, ADD, SUB, MUL, DIV, JUMP, JEQ, JNE, JLT, JGT, JLE, JGE) = range(len(OPCODES))
+
+ARITHMETIC = {'+': ADD, '-': SUB, '*': MUL, '/': DIV}
+BRANCH = {'==': JEQ, '!=': JNE, '<': JLT, '>': JGT, '<=': JLE, '>=': JGE}
+NEGATED = {JEQ: JNE, JNE: JEQ, JLT: JGE, JGE: JLT, JGT: JLE, JLE: JGT}
+
+
+class VMError(Exception):
+    def __init__(self, message, pos=None):
+        super().__init__(message)
+        self.pos = pos  # source offset of the failing statement, if known
+
+
+class LimitExceeded(VMError):
+    def __init__(self, message, steps):
+        super().__init__(message)
+        self.steps = steps
+
+
+class Code:
+    # A compiled program.  Only arrays and lists, so it pickles compactly.
+    __slots__ = ('code', 'positions', 'names', 'consts', 'nslots')
+
+    def __init__(self, code, positions, names, consts, nslots):
+        self.code = code            # array('i'), four words per instruction
+        self.positions = positions  # array('q'), source offset of each instruction
+        self.names = names          # variable names, by slot
+        self.consts = consts        # constant values, in the slots after the variables
+        self.nslots = nslots
+
+    def __len__(self):
+        return len(self.code) // 4
+
+    def slots(self, variables=None):
+        slots = [0] * len(self.names) + self.consts
+        slots += [0] * (self.nslots - len(slots))
+        if variables:
+            for i, name in enumerate(self.names):
+                if name in variables:
+                    slots[i] = variables[name]
+        return slots
+
+    def slot_name(self, i):
+        if i < len(self.names):
+            return self.names[i]
+        if i < len(self.names) + len(self.consts):
+            return repr(self.consts[i - len(self.names)])
+        return f'%{i}'
+
+    def disassemble(self):
+        lines = []
+        code = self.code
+        for pc in range(len(self)):
+            op, a, b, c = code[4 * pc:4 * pc + 4]
+            if op == MOVE:
+                args = f'{self.slot_name(a)} {self.slot_name(b)}'
+            elif op in (ADD, SUB, MUL, DIV):
+                args = f'{self.slot_name(a)} {self.slot_name(b)} {self.slot_name(c)}'
+            elif op == JUMP:
+                args = str(a)
+            elif op >= JEQ:
+                args = f'{self.slot_name(a)} {self.slot_name(b)} {c}'
+            else:
+                args = ''
+            lines.append(f'{pc:5d}  {OPCODES[op]:<5} {args}'.rstrip())
+        return '\n'.join(lines)
+
+
+class _Compiler:
+    def __init__(self):
+        self.code = array('i')
+        self.positions = array('q')
+        self.names = {}
+        self.consts = {}
+        self.temps = 0
+        self.max_temps = 0
+
+    def emit(self, op, a=0, b=0, c=0, pos=0):
+        self.code.extend((op, a, b, c))
+        self.positions.append(pos)
+        return len(self.positions) - 1
+
+    def here(self):
+        return len(self.positions)
+
+    def patch(self, pc, word, target):
+        self.code[4 * pc + word] = target
+
+    # Slot numbers are provisional while compiling: variables are numbered
+    # from 0, constants from CONST and temporaries from TEMP, and link()
+    # moves the constants and temporaries down to follow the variables.
+    CONST = 1 << 28
+    TEMP = 1 << 29
+
+    def variable(self, name):
+        return self.names.setdefault(name, len(self.names))
+
+    def constant(self, value):
+        return self.CONST + self.consts.setdefault(value, len(self.consts))
+
+    # Blocks and expressions nest without limit, so both are compiled from
+    # explicit stacks rather than by recursion.
+
+    def statements(self, body):
+        # Pending work is statements and callables; either may return more
+        # work to do before what follows it
+        stack = list(reversed(body))
+        while stack:
+            item = stack.pop()
+            more = item() if callable(item) else self.statement(item)
+            if more:
+                stack.extend(reversed(more))
+
+    def statement(self, node):
+        # Emit the start of node and return the work that completes it
+        kind = type(node)
+        if kind is Assign:
+            target = self.variable(node.target)
+            value = node.value
+            if type(value) is BinOp:
+                self.binop(value, target)
+            else:
+                self.emit(MOVE, target, self.operand(value), pos=node.pos)
+            return None
+        if kind is If:
+            skip = self.branch(node.test, negate=True)
+            return [*node.body, lambda: self.patch(skip, 3, self.here())]
+        if kind is IfElse:
+            skip = self.branch(node.test, negate=True)
+            return [*node.body, lambda: self.orelse(node, skip)]
+        if kind is While:
+            enter = self.emit(JUMP, pos=node.pos)
+            top = self.here()
+            return [*node.body, lambda: self.loop(node, enter, top)]
+        if kind is Error:
+            raise ValueError('Cannot compile a program with syntax errors')
+        raise ValueError(f'Cannot compile {kind.__name__} nodes')
+
+    def orelse(self, node, skip):
+        end = self.emit(JUMP, pos=node.pos)
+        self.patch(skip, 3, self.here())
+        return [*node.orelse, lambda: self.patch(end, 1, self.here())]
+
+    def loop(self, node, enter, top):
+        self.patch(enter, 1, self.here())
+        self.patch(self.branch(node.test, negate=False), 3, top)
+
+    def branch(self, test, negate):
+        # Emit the fused compare-and-jump of test; the caller patches its target
+        if type(test) is not Compare:
+            raise ValueError(f'Expected a comparison, not {type(test).__name__}')
+        left = self.operand(test.left)
+        right = self.operand(test.right)
+        self.release(left, right)
+        op = BRANCH[test.op]
+        return self.emit(NEGATED[op] if negate else op, left, right, pos=test.pos)
+
+    def operand(self, node):
+        # The slot holding node's value, computing it into a temporary if needed
+        kind = type(node)
+        if kind is Name:
+            return self.variable(node.id)
+        if kind is Num:
+            return self.constant(node.value)
+        if kind is BinOp:
+            return self.binop(node, None)
+        raise ValueError(f'Cannot compile {kind.__name__} nodes')
+
+    def binop(self, node, target):
+        # Operands are computed before target is written, so x = (x + 1) * x
+        # reads the old x on both sides.  Post-order: an entry is pushed
+        # again with done=True and emitted once both operand slots are known.
+        slots = []
+        stack = [(node, target, False)]
+        while stack:
+            item, dest, done = stack.pop()
+            if done:
+                right = slots.pop()
+                left = slots.pop()
+                self.release(left, right)
+                if dest is None:
+                    dest = self.TEMP + self.temps
+                    self.temps += 1
+                    self.max_temps = max(self.max_temps, self.temps)
+                self.emit(ARITHMETIC[item.op], dest, left, right, pos=item.pos)
+                slots.append(dest)
+            elif type(item) is BinOp:
+                stack.append((item, dest, True))
+                stack.append((item.right, None, False))
+                stack.append((item.left, None, False))
+            else:
+                slots.append(self.operand(item))
+        return slots[0]
+
+    def release(self, *slots):
+        for slot in slots:
+            if slot >= self.TEMP:
+                self.temps -= 1
+
+    def link(self):
+        self.emit(HALT)
+        nvars = len(self.names)
+        nconsts = len(self.consts)
+        code = self.code
+        for pc in range(0, len(code), 4):
+            op = code[pc]
+            words = (1, 2, 3) if op in (ADD, SUB, MUL, DIV) else (1, 2) if op == MOVE or op >= JEQ else ()
+            for w in words:
+                slot = code[pc + w]
+                if slot >= self.TEMP:
+                    code[pc + w] = slot - self.TEMP + nvars + nconsts
+                elif slot >= self.CONST:
+                    code[pc + w] = slot - self.CONST + nvars
+        return Code(code, self.positions, list(self.names), list(self.consts),
+                    nvars + nconsts + self.max_temps)
+
+
+def compile_tree(tree, names=()):
+    # tree: a Program, a single statement (the if and ifelse dialects) or a
+    # list of statements.  names are variables to keep even where tree does
+    # not use them, such as those of the tree before optimisation.
+    if tree is None:
+        raise ValueError('Cannot compile a program with syntax errors')
+    compiler = _Compiler()
+    for name in names:
+        compiler.variable(name)
+    if type(tree) is Program:
+        compiler.statements(tree.body)
+    elif isinstance(tree, list):
+        compiler.statements(tree)
+    else:
+        compiler.statements([tree])
+    return compiler.link()
+
+
+def divide(a, b):
+    # Integer division truncating towards zero, as in C
+    q = a // b
+    if q < 0 and q * b != a:
+        q += 1
+    return q
+
+
+def run(code, variables=None, max_steps=None, timeout=None):
+    # Execute code and return the final value of every variable
+    slots = code.slots(variables)
+    words = code.code
+    program = list(zip(words[0::4], words[1::4], words[2::4], words[3::4]))
+    deadline = None if timeout is None else perf_counter() + timeout
+    steps = 0
+    pc = 0
+    try:
+        while True:
+            chunk = CHECK_INTERVAL
+            if max_steps is not None:
+                chunk = min(chunk, max_steps - steps)
+                if chunk <= 0:
+                    raise LimitExceeded(f'Step limit of {max_steps} exceeded', steps)
+            # The range counts the instructions; the opcodes are tested in
+            # roughly the order loop-heavy programs need them
+            for _ in range(chunk):
+                op, a, b, c = program[pc]
+                pc += 1
+                if op == ADD:
+                    slots[a] = slots[b] + slots[c]
+                elif op == JLT:
+                    if slots[a] < slots[b]:
+                        pc = c
+                elif op == SUB:
+                    slots[a] = slots[b] - slots[c]
+                elif op == MOVE:
+                    slots[a] = slots[b]
+                elif op == MUL:
+                    slots[a] = slots[b] * slots[c]
+                elif op == JGE:
+                    if slots[a] >= slots[b]:
+                        pc = c
+                elif op == JNE:
+                    if slots[a] != slots[b]:
+                        pc = c
+                elif op == JEQ:
+                    if slots[a] == slots[b]:
+                        pc = c
+                elif op == JGT:
+                    if slots[a] > slots[b]:
+                        pc = c
+                elif op == JLE:
+                    if slots[a] <= slots[b]:
+                        pc = c
+                elif op == JUMP:
+                    pc = a
+                elif op == DIV:
+                    slots[a] = divide(slots[b], slots[c])
+                else:
+                    steps += _ + 1
+                    break
+            else:
+                steps += chunk
+                if deadline is not None and perf_counter() > deadline:
+                    raise LimitExceeded(f'Time limit of {timeout} s exceeded', steps)
+                continue
+            break
+    except ZeroDivisionError:
+        raise VMError('Division by zero', code.positions[pc - 1]) from None
+    result = dict(variables) if variables else {}
+    result.update(zip(code.names, slots))
+    return result
+
+
+def main(argv=None):
+    from .lines import LineIndex
+    from .registry import get_grammar, grammar_names
+
+    ap = argparse.ArgumentParser(prog='python -m miniparsers.vm',
+                                 description='Run an if/while program and print its variables.')
+    ap.add_argument('path', help='program to run')
+    ap.add_argument('-g', '--grammar', default='while', choices=grammar_names(),
+                    help='dialect of the program (default: while)')
+    ap.add_argument('--max-steps', type=int, help='stop after this many instructions')
+    ap.add_argument('--timeout', type=float, help='stop after this many seconds')
+    ap.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                    help='initial value of a variable (repeatable)')
+    ap.add_argument('--disassemble', action='store_true', help='print the bytecode instead of running it')
+    args = ap.parse_args(argv)
+
+    with open(args.path) as f:
+        text = f.read()
+    grammar = get_grammar(args.grammar)
+    try:
+        code = grammar.compile(text)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.disassemble:
+        print(code.disassemble())
+        return 0
+    variables = {}
+    for item in args.set:
+        name, _, value = item.partition('=')
+        variables[name] = int(value)
+    try:
+        result = run(code, variables, args.max_steps, args.timeout)
+    except VMError as e:
+        if e.pos is None:
+            print(e, file=sys.stderr)
+        else:
+            line, column = LineIndex(text).location(e.pos)
+            print(f'line {line}, column {column}: {e}', file=sys.stderr)
+        return 1
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+from .nodes import BinOp, Compare, Error, Name, Node
+
+# Tree walking without recursion.
+#
+# Blocks nest without limit (block : LBRACE statement_list RBRACE) and
+# left-associative operators build left-deep expression trees, so machine
+# generated programs reach depths far beyond Python's recursion limit.
+# Everything here keeps its own stack on the heap; memory grows linearly with
+# the depth and no frame is used per level.
+#
+#   for node in iter_nodes(tree): ...              # pre-order, source order
+#
+#   class Names(Visitor):                          # enter_<Class> before the
+#       def enter_Name(self, node): ...            # children, leave_<Class>
+#   Names().visit(tree)                            # after; enter may return
+#                                                  # False to skip them
+#
+#   class Double(Transformer):                     # bottom-up rebuild
+#       def leave_Num(self, node):
+#           return Num(node.value * 2, node.pos)
+#   tree = Double().transform(tree)
+#
+#   dump(tree)      # the repr() of a tree
+#   unparse(tree)   # source text in the dialect's syntax
+#
+# A Transformer's leave_<Class>(node) gets the node with its children already
+# transformed: the original node if none of them changed, otherwise a copy.
+# It returns the replacement: the node itself, another node, a list of
+# statements (spliced into the enclosing block) or None (removed from it).
+# block(body) is called on every transformed list.  The input tree is never
+# modified and unchanged subtrees are shared with the result.
+
+
+def iter_nodes(tree):
+    stack = [tree]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(reversed(item))
+        elif isinstance(item, Node):
+            yield item
+            for name in reversed(item._children):
+                stack.append(getattr(item, name))
+
+
+class _Dispatch:
+    # Per-class lookup of the enter_/leave_ methods of a walker
+    def _methods(self, prefix):
+        cache = {}
+
+        def method(cls):
+            try:
+                return cache[cls]
+            except KeyError:
+                found = cache[cls] = getattr(self, prefix + cls.__name__, None)
+                return found
+        return method
+
+
+_LEAVE = object()
+
+
+class Visitor(_Dispatch):
+    def visit(self, tree):
+        enter = self._methods('enter_')
+        leave = self._methods('leave_')
+        stack = [tree]
+        while stack:
+            item = stack.pop()
+            if item is _LEAVE:
+                node = stack.pop()
+                leave(type(node))(node)
+            elif isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, Node):
+                method = enter(type(item))
+                if method is not None and method(item) is False:
+                    continue
+                if leave(type(item)) is not None:
+                    stack.append(item)
+                    stack.append(_LEAVE)
+                for name in reversed(item._children):
+                    stack.append(getattr(item, name))
+
+
+_BUILD_LIST = object()
+_BUILD_NODE = object()
+
+
+def _copy(node, names, values):
+    new = object.__new__(type(node))
+    new.pos = node.pos
+    for name in node._fields:
+        setattr(new, name, getattr(node, name))
+    for name, value in zip(names, values):
+        setattr(new, name, value)
+    return new
+
+
+class Transformer(_Dispatch):
+    def block(self, body):
+        return body
+
+    def transform(self, tree):
+        methods = {}  # class -> (its _children, its leave method)
+        block = self.block
+        results = []
+        append = results.append
+        stack = [tree]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            item = pop()
+            if item is _BUILD_NODE:
+                names, method = pop()
+                node = pop()
+                n = len(names)
+                values = results[-n:]
+                del results[-n:]
+                for name, value in zip(names, values):
+                    if getattr(node, name) is not value:
+                        node = _copy(node, names, values)
+                        break
+                append(node if method is None else method(node))
+            elif item is _BUILD_LIST:
+                old = pop()
+                n = len(old)
+                new = results[-n:] if n else []
+                if n:
+                    del results[-n:]
+                body = old
+                for a, b in zip(old, new):
+                    if a is not b:
+                        body = []
+                        for value in new:
+                            if type(value) is list:
+                                body.extend(value)
+                            elif value is not None:
+                                body.append(value)
+                        break
+                append(block(body))
+            elif type(item) is list:
+                push(item)
+                push(_BUILD_LIST)
+                stack.extend(reversed(item))
+            else:
+                cls = type(item)
+                entry = methods.get(cls)
+                if entry is None:
+                    if not isinstance(item, Node):
+                        append(item)
+                        continue
+                    entry = methods[cls] = (cls._children, getattr(self, 'leave_' + cls.__name__, None))
+                names, method = entry
+                if names:
+                    push(item)
+                    push(entry)
+                    push(_BUILD_NODE)
+                    for name in reversed(names):
+                        push(getattr(item, name))
+                else:
+                    append(item if method is None else method(item))
+        return results[0]
+
+
+def dump(tree):
+    # repr(tree), built from a stack of pieces instead of nested repr() calls
+    parts = []
+    stack = [tree]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            parts.append(item)
+        elif isinstance(item, Node):
+            pieces = [f'{type(item).__name__}(']
+            for i, name in enumerate(item._fields):
+                pieces.append(f', {name}=' if i else f'{name}=')
+                value = getattr(item, name)
+                pieces.append(value if isinstance(value, (Node, list)) else repr(value))
+            pieces.append(')')
+            stack.extend(reversed(pieces))
+        elif isinstance(item, list):
+            pieces = ['[']
+            for i, value in enumerate(item):
+                if i:
+                    pieces.append(', ')
+                pieces.append(value if isinstance(value, (Node, list)) else repr(value))
+            pieces.append(']')
+            stack.extend(reversed(pieces))
+        else:
+            parts.append(repr(item))
+    return ''.join(parts)
+
+
+PRECEDENCE = {'==': 0, '!=': 0, '<': 0, '>': 0, '<=': 0, '>=': 0, '+': 1, '-': 1, '*': 2, '/': 2}
+
+
+def expression(node):
+    # Source text of an expression or condition, parenthesised only where
+    # the grammar's precedence needs it (every operator is left-associative).
+    # An Error from error recovery stands as <error>.
+    parts = []
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if type(item) is str:
+            parts.append(item)
+            continue
+        kind = type(item)
+        if kind is BinOp or kind is Compare:
+            level = PRECEDENCE[item.op]
+            left, right = item.left, item.right
+            pieces = [left, f' {item.op} ', right]
+            if type(right) is BinOp and PRECEDENCE[right.op] <= level:
+                pieces[2:] = ['(', right, ')']
+            if type(left) is BinOp and PRECEDENCE[left.op] < level:
+                pieces[:1] = ['(', left, ')']
+            stack.extend(reversed(pieces))
+        elif kind is Name:
+            parts.append(item.id)
+        elif kind is Error:
+            parts.append('<error>')
+        elif item.value < 0:
+            parts.append(f'(0 - {-item.value})')  # folded constants can be negative
+        else:
+            parts.append(str(item.value))
+    return ''.join(parts)
+
+
+MAX_INDENT = 32
+
+
+def unparse(tree, indent='    '):
+    # Source text of a tree; parsing it again gives an equal tree up to pos.
+    # Indentation stops growing after MAX_INDENT levels, so the text stays
+    # linear in the size of very deep trees.  The Error nodes of a tree with
+    # syntax errors become // syntax error statements and <error> conditions
+    # and parameters, so that text does not parse again.
+    lines = []
+    stack = [(0, tree)]
+    while stack:
+        depth, item = stack.pop()
+        pad = indent * min(depth, MAX_INDENT)
+        if type(item) is str:
+            lines.append(pad + item)
+            continue
+        if isinstance(item, list):
+            stack.extend((depth, node) for node in reversed(item))
+            continue
+        kind = type(item).__name__
+        if kind == 'Program':
+            stack.extend((depth, node) for node in reversed(item.body))
+        elif kind == 'Assign':
+            lines.append(f'{pad}{item.target} = {expression(item.value)};')
+        elif kind == 'Return':
+            lines.append(f'{pad}return {expression(item.value)};')
+        elif kind == 'Error':
+            lines.append(f'{pad}// syntax error')
+        elif kind == 'FunctionDef':
+            params = ', '.join('<error>' if type(p) is Error else f'{p.type} {p.name}' for p in item.params)
+            lines.append(f'{pad}{item.type} {item.name}({params}) {{')
+            stack.append((depth, '}'))
+            stack.append((depth + 1, item.body))
+        elif kind == 'IfElse':
+            lines.append(f'{pad}if ({expression(item.test)}) {{')
+            stack.append((depth, '}'))
+            stack.append((depth + 1, item.orelse))
+            stack.append((depth, '} else {'))
+            stack.append((depth + 1, item.body))
+        else:  # If, While
+            keyword = 'while' if kind == 'While' else 'if'
+            lines.append(f'{pad}{keyword} ({expression(item.test)}) {{')
+            stack.append((depth, '}'))
+            stack.append((depth + 1, item.body))
+    return '\n'.join(lines) + '\n'